@@ -0,0 +1,132 @@
+#! /usr/bin/env python
+
+# This library is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as
+# published by the Free Software Foundation; either version 3 of the
+# License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, see
+# <http://www.gnu.org/licenses/>.
+
+
+"""
+Times unpacking and fully decoding the constant pools of the class
+files in tests/data, and of a large synthetic constant pool containing
+every constant type.
+
+usage: python extras/bench_cpool.py [-n REPEAT] [-s SIZE]
+
+:license: LGPL
+"""
+
+
+import sys
+
+from argparse import ArgumentParser
+from glob import glob
+from os.path import dirname, join
+from struct import pack
+from timeit import repeat
+
+from javatools import JavaConstantPool, unpack_class
+from javatools.pack import unpack
+
+
+DATA_DIR = join(dirname(dirname(__file__)), "tests", "data")
+
+
+def synthetic_pool(count):
+    """
+    bytes of a constant pool (including its count) with roughly count
+    entries, cycling through each of the constant types
+    """
+
+    entries = []
+    index = 1
+
+    while index < count - 12:
+        name = ("name%i" % index).encode("utf8")
+        entries.append(pack(">BH", 1, len(name)) + name)
+        entries.append(pack(">Bi", 3, index))
+        entries.append(pack(">Bf", 4, index))
+        entries.append(pack(">Bq", 5, index))
+        entries.append(pack(">Bd", 6, index))
+        entries.append(pack(">BH", 7, index))
+        entries.append(pack(">BH", 8, index))
+        entries.append(pack(">BHH", 9, index + 5, index + 8))
+        entries.append(pack(">BHH", 10, index + 5, index + 8))
+        entries.append(pack(">BHH", 12, index, index))
+        entries.append(pack(">BBH", 15, 6, index + 9))
+        entries.append(pack(">BH", 16, index))
+        entries.append(pack(">BHH", 18, 0, index + 10))
+
+        # the long and double take two slots each
+        index += 15
+
+    return pack(">H", index) + b"".join(entries)
+
+
+def decode_pool(data):
+    cpool = JavaConstantPool()
+    with unpack(data, zero_copy=True) as up:
+        cpool.unpack(up)
+    return cpool.consts
+
+
+def decode_classes(datas):
+    for data in datas:
+        unpack_class(data).cpool.consts
+
+
+def report(label, times, number):
+    best = min(times) / number
+    print("%s: %.3f ms per run" % (label, best * 1000))
+
+
+def cli(options):
+    classes = []
+    for fn in sorted(glob(join(DATA_DIR, "*.class"))):
+        with open(fn, "rb") as fd:
+            classes.append(fd.read())
+
+    pool = synthetic_pool(options.size)
+    number = 10
+
+    times = repeat(lambda: decode_classes(classes),
+                   repeat=options.repeat, number=number)
+    report("tests/data/*.class (%i classes)" % len(classes), times, number)
+
+    times = repeat(lambda: decode_pool(pool),
+                   repeat=options.repeat, number=number)
+    report("synthetic pool (%i entries)" % options.size, times, number)
+
+    return 0
+
+
+def create_optparser():
+    parser = ArgumentParser(prog="bench_cpool")
+    parser.add_argument("-n", "--repeat", type=int, default=5,
+                        help="number of timing runs, best is reported")
+    parser.add_argument("-s", "--size", type=int, default=60000,
+                        help="number of entries in the synthetic pool")
+    return parser
+
+
+def main(args=sys.argv):
+    parser = create_optparser()
+    options = parser.parse_args(args[1:])
+    return cli(options)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
+
+
+#
+# The end.
@@ -0,0 +1,101 @@
+#! /usr/bin/env python
+
+# This library is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as
+# published by the Free Software Foundation; either version 3 of the
+# License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, see
+# <http://www.gnu.org/licenses/>.
+
+
+"""
+Loads every class in a jar through JarInfo, keeping them all alive,
+and reports the memory allocated per class as measured by
+tracemalloc. Each class has its members' code and attributes looked
+at, so that the lazily unpacked parts of the model are counted. With
+--decode, every constant pool entry is decoded as well.
+
+usage: python extras/bench_memory.py [--decode] JAR [JAR...]
+
+:license: LGPL
+"""
+
+
+import sys
+import tracemalloc
+
+from argparse import ArgumentParser
+
+from javatools.jarinfo import JarInfo
+
+
+def load_classes(filename, decode=False):
+    """
+    list of JavaClassInfo instances for every class in the jar, with
+    the code and attributes of each member realized, and the constant
+    pool decoded if decode is True
+    """
+
+    classes = list()
+
+    with JarInfo(filename) as ji:
+        for entry in ji.get_classes():
+            ci = ji.get_classinfo(entry)
+            ci.get_sourcefile()
+            if decode:
+                ci.cpool.consts
+            for member in ci.fields + ci.methods:
+                member.get_signature()
+                code = member.get_code()
+                if code is not None:
+                    code.get_linenumbertable()
+            classes.append(ci)
+
+    return classes
+
+
+def cli(options):
+    for filename in options.jars:
+        tracemalloc.start()
+        start, _peak = tracemalloc.get_traced_memory()
+
+        classes = load_classes(filename, options.decode)
+
+        end, _peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        count = len(classes) or 1
+        print("%s: %i classes, %i bytes per class" %
+              (filename, len(classes), (end - start) // count))
+
+    return 0
+
+
+def create_optparser():
+    parser = ArgumentParser(prog="bench_memory")
+    parser.add_argument("--decode", action="store_true", default=False,
+                        help="decode every constant pool entry")
+    parser.add_argument("jars", nargs="+", metavar="JAR",
+                        help="jar files to load")
+    return parser
+
+
+def main(args=sys.argv):
+    parser = create_optparser()
+    options = parser.parse_args(args[1:])
+    return cli(options)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
+
+
+#
+# The end.
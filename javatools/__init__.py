@@ -31,12 +31,18 @@ References
 """  # noqa
 
 
-from functools import partial
-from six.moves import range
+import codecs
+import re
 
-from .dirutils import fnmatches
-from .opcodes import disassemble
-from .pack import compile_struct, unpack, UnpackException
+from array import array
+from bisect import bisect_left, bisect_right
+from functools import lru_cache
+from hashlib import sha256
+from sys import intern as _intern
+
+from .dirutils import PatternSet
+from .opcodes import build_cfg, disassemble_arrays, OP_ldc
+from .pack import compile_struct, unpack, BufferUnpacker, UnpackException
 
 try:
     buffer
@@ -45,13 +51,19 @@ except NameError:
 
 
 __all__ = (
-    "JavaClassInfo", "JavaConstantPool", "JavaMemberInfo",
+    "JavaClassInfo", "JavaClassHeader",
+    "JavaConstantPool", "JavaMemberInfo",
     "JavaCodeInfo", "JavaExceptionInfo", "JavaInnerClassInfo",
-    "JavaAnnotation",
+    "JavaAnnotation", "JavaAnnotations", "SymbolTable",
     "NoPoolException", "Unimplemented", "ClassUnpackException",
     "platform_from_version",
     "is_class", "is_class_file",
-    "unpack_class", "unpack_classfile",
+    "unpack_class", "unpack_classfile", "unpack_class_header",
+    "deserialize_class",
+    "decode_modified_utf8", "pretty_symbol",
+    "descriptor_cache_info", "clear_descriptor_caches",
+    "PROFILE_FULL", "PROFILE_NO_DEBUG", "PROFILE_NO_CODE",
+    "PROFILE_API_ONLY",
     "CONST_Utf8", "CONST_Integer", "CONST_Float",
     "CONST_Long", "CONST_Double", "CONST_Class",
     "CONST_String", "CONST_Fieldref", "CONST_Methodref",
@@ -75,6 +87,35 @@ JAVA_CLASS_MAGIC = (0xCA, 0xFE, 0xBA, 0xBE)
 _BUFFERING = 2 ** 14
 
 
+# The class unpacking profiles. Each profile drops more of the class
+# than the last, to save unpacking the parts a caller doesn't need.
+# no-debug drops the debugging attributes, no-code drops the methods'
+# code, and api-only additionally drops the private members.
+PROFILE_FULL = "full"
+PROFILE_NO_DEBUG = "no-debug"
+PROFILE_NO_CODE = "no-code"
+PROFILE_API_ONLY = "api-only"
+
+
+_DEBUG_ATTRIBUTES = frozenset(("LineNumberTable",
+                               "LocalVariableTable",
+                               "LocalVariableTypeTable",
+                               "SourceDebugExtension"))
+
+
+# the profiles, in the order of their codes in the serialized format
+_PROFILES = (PROFILE_FULL, PROFILE_NO_DEBUG, PROFILE_NO_CODE, PROFILE_API_ONLY)
+
+
+# the names of the attributes dropped by each profile
+_PROFILE_IGNORED = {
+    PROFILE_FULL: frozenset(),
+    PROFILE_NO_DEBUG: _DEBUG_ATTRIBUTES,
+    PROFILE_NO_CODE: _DEBUG_ATTRIBUTES | frozenset(("Code",)),
+    PROFILE_API_ONLY: _DEBUG_ATTRIBUTES | frozenset(("Code",)),
+}
+
+
 # The constant pool types
 # pylint: disable=C0103
 CONST_Utf8 = 1
@@ -129,6 +170,14 @@ _HI = compile_struct(">HI")
 _HHI = compile_struct(">HHI")
 
 
+# the header of a serialized JavaClassInfo, being the magic, the
+# format version, the profile code, and the offsets of the fields,
+# methods, and attributes tables in the class data which follows
+_SERIAL_HEADER = compile_struct(">4sBBIII")
+_SERIAL_MAGIC = b"JTCI"
+_SERIAL_VERSION = 1
+
+
 class NoPoolException(Exception):
     """
     raised by methods that need a JavaConstantPool, but aren't
@@ -160,15 +209,48 @@ class JavaConstantPool(object):
     """
     A constants pool
 
+    The pool is unpacked lazily. Unpacking only records the type and
+    the byte offset of each entry, and an entry is decoded the first
+    time it is requested, after which the decoded value is kept. The
+    dereferenced and pretty dereferenced values of entries are
+    likewise kept once they have been requested.
+
+    If an interns dict is given, decoded Utf8 values are deduplicated
+    through it, so that pools sharing the same interns dict will also
+    share the same string instances.
+
     reference: http://docs.oracle.com/javase/specs/jvms/se7/html/jvms-4.html#jvms-4.4
     """  # noqa
 
-    def __init__(self):
-        self.consts = tuple()
+    __slots__ = ("_data", "_tags", "_offsets", "_consts", "_deref",
+                 "_pretty", "_interns")
+
+
+    def __init__(self, interns=None):
+        self._interns = interns
+
+        # the raw data of the pool entries, and the type code and
+        # offset into that data of each entry
+        self._data = None
+        self._tags = bytearray(1)
+        self._offsets = array("L", (0,))
+
+        # decoded entries, None until requested
+        self._consts = [(None, None)]
+
+        # dereferenced and pretty dereferenced values, None until
+        # requested
+        self._deref = [None]
+        self._pretty = [None]
 
 
     def __eq__(self, other):
-        return (isinstance(other, JavaConstantPool) and
+        if not isinstance(other, JavaConstantPool):
+            return False
+
+        # identical raw data will decode identically, so we can skip
+        # decoding both pools in that case
+        return ((self._data == other._data) or
                 (self.consts == other.consts))
 
 
@@ -176,6 +258,36 @@ class JavaConstantPool(object):
         return not self.__eq__(other)
 
 
+    def __len__(self):
+        return len(self._tags)
+
+
+    def __getstate__(self):
+        # the raw data is a view when unpacked zero-copy, which can't
+        # be pickled. The interns dict is shared with other pools, so
+        # it isn't a part of this pool's state.
+        state = dict((slot, getattr(self, slot)) for slot in self.__slots__
+                     if slot != "_interns")
+        state["_data"] = _as_bytes(self._data)
+        return state
+
+
+    def __setstate__(self, state):
+        self._interns = None
+        for slot, value in state.items():
+            setattr(self, slot, value)
+
+
+    @property
+    def consts(self):
+        """
+        tuple of the (type, value) pairs of every entry in the constant
+        pool. This will decode every entry in the pool.
+        """
+
+        return tuple(self.get_const(i) for i in range(len(self._tags)))
+
+
     def unpack(self, unpacker):
         """
         Unpacks the constant pool from an unpacker stream
@@ -183,40 +295,61 @@ class JavaConstantPool(object):
 
         (count, ) = unpacker.unpack_struct(_H)
 
-        # first item is never present in the actual data buffer, but
-        # the count number acts like it would be.
-        items = [(None, None), ]
-        count -= 1
+        if isinstance(unpacker, BufferUnpacker):
+            # index the entries in place, then take the entries'
+            # data (which will be a view when unpacking zero-copy)
+            index = _index_const_items(unpacker.data, unpacker.offset, count)
+            tags, offsets, size = index
+            data = unpacker.read(size)
 
-        # Long and Double const types will "consume" an item count,
-        # but not data
-        hackpass = False
+        else:
+            data = _read_const_items(unpacker, count)
+            tags, offsets, _size = _index_const_items(data, 0, count)
+
+        consts = [None] * count
+        for i in range(0, count):
+            if not tags[i]:
+                # the first item is never present in the actual data
+                # buffer, but the count number acts like it
+                # would. Long and Double const types will also
+                # "consume" an item count, but not data.
+                consts[i] = (None, None)
+
+        self._data = data
+        self._tags = tags
+        self._offsets = offsets
+        self._consts = consts
+        self._deref = [None] * count
+        self._pretty = [None] * count
 
-        for _i in range(0, count):
 
-            if hackpass:
-                # previous item was a long or double
-                hackpass = False
-                items.append((None, None))
+    def get_const(self, index):
+        """
+        returns the type and value of the constant at index
+        """
 
-            else:
-                item = _unpack_const_item(unpacker)
-                items.append(item)
+        const = self._consts[index]
+        if const is None:
+            const = _unpack_const_item(self._data, self._offsets[index])
 
-                # if this item was a long or double, skip the next
-                # counter.
-                if item[0] in (CONST_Long, CONST_Double):
-                    hackpass = True
+            interns = self._interns
+            if interns is not None and const[0] == CONST_Utf8:
+                val = const[1]
+                const = (CONST_Utf8, interns.setdefault(val, val))
 
-        self.consts = items
+            self._consts[index] = const
 
+        return const
 
-    def get_const(self, index):
+
+    def get_const_type(self, index):
         """
-        returns the type and value of the constant at index
+        returns the type of the constant at index, without decoding its
+        value. None for invalid indexes (such as the second part of a
+        long or double value)
         """
 
-        return self.consts[index]
+        return self._tags[index] or None
 
 
     def deref_const(self, index):
@@ -230,7 +363,16 @@ class JavaConstantPool(object):
         if not index:
             raise IndexError("Requested const 0")
 
-        t, v = self.consts[index]
+        result = self._deref[index]
+        if result is None:
+            result = self._deref_const(index)
+            self._deref[index] = result
+
+        return result
+
+
+    def _deref_const(self, index):
+        t, v = self.get_const(index)
 
         if t in (CONST_Utf8, CONST_Integer, CONST_Float,
                  CONST_Long, CONST_Double):
@@ -245,7 +387,7 @@ class JavaConstantPool(object):
             return tuple(self.deref_const(i) for i in v)
 
         elif t == CONST_MethodHandle:
-            return (v[0], self.dref_const(v[1]))
+            return (v[0], self.deref_const(v[1]))
 
         elif t == CONST_MethodType:
             return self.deref_const(v[0])
@@ -264,10 +406,9 @@ class JavaConstantPool(object):
         constant pool entries.
         """
 
-        for i in range(1, len(self.consts)):
-            t, _v = self.consts[i]
-            if t:
-                yield (i, t, self.deref_const(i))
+        for i in range(1, len(self._tags)):
+            if self._tags[i]:
+                yield (i, self._tags[i], self.deref_const(i))
 
 
     def pretty_constants(self):
@@ -276,7 +417,7 @@ class JavaConstantPool(object):
         pool entries.
         """
 
-        for i in range(1, len(self.consts)):
+        for i in range(1, len(self._tags)):
             t, v = self.pretty_const(i)
             if t:
                 yield (i, t, v)
@@ -288,7 +429,7 @@ class JavaConstantPool(object):
         indexes (such as the second part of a long or double value)
         """
 
-        t, v = self.consts[index]
+        t, v = self.get_const(index)
         if not t:
             return None, None
         else:
@@ -304,7 +445,16 @@ class JavaConstantPool(object):
         and value derefenced constants)
         """
 
-        t, v = self.consts[index]
+        result = self._pretty[index]
+        if result is None:
+            result = self._pretty_deref_const(index)
+            self._pretty[index] = result
+
+        return result
+
+
+    def _pretty_deref_const(self, index):
+        t, v = self.get_const(index)
 
         if t == CONST_String:
             result = self.deref_const(v)
@@ -362,11 +512,28 @@ class JavaAttributes(dict):
     attributes table, as used in class, member, and code
     structures. Requires access to a JavaConstantPool instance for
     many of its methods to work correctly.
+
+    When unpacked from a buffer, the attributes are deferred. Only the
+    name index, offset, and length of each attribute is recorded, and
+    the mapping of names to bodies is built the first time the table
+    is read from. When unpacked from a zero-copy unpacker, the
+    attribute bodies are memoryview slices of the original class data
+    rather than copies.
+
+    Attributes whose names are in ignored are skipped over rather than
+    added to the mapping.
     """
 
-    def __init__(self, cpool):
+    def __init__(self, cpool, ignored=frozenset()):
         dict.__init__(self)
         self.cpool = cpool
+        self.ignored = ignored
+
+        # the buffer the attributes were unpacked from, and the
+        # (name_index, offset, length) of each attribute within it
+        # which has yet to be added to the mapping
+        self._data = None
+        self._deferred = None
 
 
     def unpack(self, unpacker):
@@ -375,25 +542,337 @@ class JavaAttributes(dict):
         structure of this instance.
         """
 
+        (count,) = unpacker.unpack_struct(_H)
+        if not count:
+            return
+
+        if isinstance(unpacker, BufferUnpacker):
+            deferred = list()
+            for _i in range(0, count):
+                (name, size) = unpacker.unpack_struct(_HI)
+                deferred.append((name, unpacker.offset, size))
+                unpacker.skip(size)
+
+            self._data = unpacker.data
+            self._deferred = deferred
+
+        else:
+            # bound method for dereferencing constants
+            cval = self.cpool.deref_const
+            ignored = self.ignored
+
+            for _i in range(0, count):
+                (name, size) = unpacker.unpack_struct(_HI)
+                name = cval(name)
+                if name in ignored:
+                    unpacker.skip(size)
+                else:
+                    self[name] = unpacker.read(size)
+
+
+    def _realize(self):
+        """
+        add any deferred attributes to the mapping
+        """
+
+        deferred = self._deferred
+        if not deferred:
+            return
+
         # bound method for dereferencing constants
         cval = self.cpool.deref_const
+        ignored = self.ignored
+        data = self._data
 
-        (count,) = unpacker.unpack_struct(_H)
-        for _i in range(0, count):
-            (name, size) = unpacker.unpack_struct(_HI)
-            self[cval(name)] = unpacker.read(size)
+        for name, offset, size in deferred:
+            name = cval(name)
+            if name not in ignored:
+                dict.__setitem__(self, name, data[offset:offset + size])
+
+        self._data = None
+        self._deferred = None
+
+
+    def __reduce_ex__(self, protocol):
+        # zero-copy bodies are views, which can't be pickled
+        self._realize()
+        items = ((k, _as_bytes(v)) for k, v in dict.items(self))
+        return (JavaAttributes, (self.cpool, self.ignored),
+                None, None, items)
+
+
+    def __getitem__(self, key):
+        self._realize()
+        return dict.__getitem__(self, key)
+
+
+    def __setitem__(self, key, value):
+        self._realize()
+        dict.__setitem__(self, key, value)
+
+
+    def __delitem__(self, key):
+        self._realize()
+        dict.__delitem__(self, key)
+
+
+    def __contains__(self, key):
+        self._realize()
+        return dict.__contains__(self, key)
+
+
+    def __iter__(self):
+        self._realize()
+        return dict.__iter__(self)
+
+
+    def __len__(self):
+        self._realize()
+        return dict.__len__(self)
+
+
+    def __eq__(self, other):
+        self._realize()
+        if isinstance(other, JavaAttributes):
+            other._realize()
+        return dict.__eq__(self, other)
+
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        if result is NotImplemented:
+            return result
+        return not result
+
+
+    def __repr__(self):
+        self._realize()
+        return dict.__repr__(self)
+
+
+    def get(self, key, default=None):
+        self._realize()
+        return dict.get(self, key, default)
+
+
+    def keys(self):
+        self._realize()
+        return dict.keys(self)
+
+
+    def values(self):
+        self._realize()
+        return dict.values(self)
+
+
+    def items(self):
+        self._realize()
+        return dict.items(self)
+
+
+    def pop(self, key, *default):
+        self._realize()
+        return dict.pop(self, key, *default)
+
+
+    def popitem(self):
+        self._realize()
+        return dict.popitem(self)
+
+
+    def setdefault(self, key, default=None):
+        self._realize()
+        return dict.setdefault(self, key, default)
+
+
+    def update(self, *args, **kwds):
+        self._realize()
+        dict.update(self, *args, **kwds)
+
+
+    def clear(self):
+        # the deferred attributes are dropped rather than realized
+        self._data = None
+        self._deferred = None
+        dict.clear(self)
+
+
+    def copy(self):
+        self._realize()
+        dupe = JavaAttributes(self.cpool, self.ignored)
+        dict.update(dupe, dict.items(self))
+        return dupe
+
+
+def _unpack_class_header(unpacker, cpool, magic=None):
+    """
+    unpacks the magic, version, constant pool, access flags, this and
+    super references, and interfaces of a Java class, which is
+    everything up to its fields. The constant pool is unpacked into
+    cpool, and a tuple of the rest is returned.
+    """
+
+    # only unpack the magic bytes if it wasn't specified
+    magic = magic or unpacker.unpack_struct(_BBBB)
+
+    if isinstance(magic, (str, buffer)):
+        magic = tuple(ord(m) for m in magic)
+    else:
+        magic = tuple(magic)
+
+    if magic != JAVA_CLASS_MAGIC:
+        raise ClassUnpackException("Not a Java class file")
+
+    # unpack (minor, major), store as (major, minor)
+    version = unpacker.unpack_struct(_HH)[::-1]
+
+    # unpack constant pool
+    cpool.unpack(unpacker)
+
+    (access_flags, this_ref, super_ref) = unpacker.unpack_struct(_HHH)
+
+    # unpack interfaces
+    (count,) = unpacker.unpack_struct(_H)
+    interfaces = unpacker.unpack(">%iH" % count)
+
+    return magic, version, access_flags, this_ref, super_ref, interfaces
+
+
+class JavaClassHeader(object):
+    """
+    The version, access flags, name, super class, and interfaces of a
+    Java class, as unpacked by `unpack_class_header`. Only the constant
+    pool entries for the names are decoded, and the constant pool
+    itself is not kept.
+    """
+
+    __slots__ = ("version", "access_flags", "name", "super_name",
+                 "interfaces")
+
+
+    def __init__(self):
+        self.version = (0, 0)
+        self.access_flags = 0
+        self.name = None
+        self.super_name = None
+        self.interfaces = tuple()
+
+
+    def unpack(self, unpacker, magic=None):
+        """
+        Unpacks the header of a Java class from an unpacker stream,
+        leaving the unpacker at the start of the class's fields.
+        Updates the structure of this instance.
+        """
+
+        cpool = JavaConstantPool()
+        header = _unpack_class_header(unpacker, cpool, magic)
+        (_magic, version, access_flags, this_ref, super_ref, ifaces) = header
+
+        self.version = version
+        self.access_flags = access_flags
+        self.name = cpool.deref_const(this_ref)
+
+        # only java.lang.Object has no super class
+        self.super_name = cpool.deref_const(super_ref) if super_ref else None
+        self.interfaces = tuple(cpool.deref_const(i) for i in ifaces)
+
+
+    def get_platform(self):
+        """
+        The platform this class was compiled for
+        """
+
+        return platform_from_version(*self.version)
+
+
+    def is_interface(self):
+        """
+        is this an interface
+        """
+
+        return self.access_flags & ACC_INTERFACE
+
+
+    def get_this(self):
+        """
+        the name of this class
+        """
+
+        return self.name
+
+
+    def get_super(self):
+        """
+        get the parent class that this extends, or None for
+        java.lang.Object
+        """
+
+        return self.super_name
+
+
+    def get_interfaces(self):
+        """
+        tuple of interfaces that this class implements
+        """
+
+        return self.interfaces
+
+
+    def pretty_this(self):
+        """
+        the name of this class in a pretty format
+        """
+
+        return _pretty_class(self.name)
+
+
+    def pretty_super(self):
+        """
+        the name of the parent class in a pretty format, or None for
+        java.lang.Object
+        """
+
+        return self.super_name and _pretty_class(self.super_name)
+
+
+    def pretty_interfaces(self):
+        """
+        tuple of the names of the interfaces this class implements, in a
+        pretty format
+        """
+
+        return tuple(_pretty_class(i) for i in self.interfaces)
 
 
 class JavaClassInfo(object):
     """
     Information from a disassembled Java class file.
 
+    When unpacked from a buffer, the class data is kept along with the
+    offsets of its fields, methods, and attributes tables, so that the
+    class may be serialized (and pickled) as that data. Classes
+    rebuilt from their serialized form only unpack their fields and
+    methods when they are first needed.
+
     reference: http://docs.oracle.com/javase/specs/jvms/se7/html/jvms-4.html
     """
 
-    def __init__(self):
-        self.cpool = JavaConstantPool()
-        self.attribs = JavaAttributes(self.cpool)
+    __slots__ = ("cpool", "attribs", "profile", "magic", "version",
+                 "access_flags", "this_ref", "super_ref", "interfaces",
+                 "annotations", "invisible_annotations",
+                 "_fields", "_methods", "_raw", "_index",
+                 "_member_indexes",
+                 "_provides", "_provides_private", "_requires")
+
+
+    def __init__(self, interns=None, profile=PROFILE_FULL):
+        if profile not in _PROFILE_IGNORED:
+            raise ValueError("unknown unpacking profile %r" % profile)
+
+        self.cpool = JavaConstantPool(interns)
+        self.attribs = JavaAttributes(self.cpool, _PROFILE_IGNORED[profile])
+        self.profile = profile
 
         self.magic = JAVA_CLASS_MAGIC
         self.version = (0, 0)
@@ -401,11 +880,20 @@ class JavaClassInfo(object):
         self.this_ref = 0
         self.super_ref = 0
         self.interfaces = tuple()
-        self.fields = tuple()
-        self.methods = tuple()
         self.annotations = None
         self.invisible_annotations = None
 
+        self._fields = tuple()
+        self._methods = tuple()
+
+        # the lookup dicts of the members, built when first needed
+        self._member_indexes = {}
+
+        # the class data following the magic bytes, and the offsets
+        # within it of the fields, methods, and attributes tables
+        self._raw = None
+        self._index = None
+
         self._provides = None
         self._provides_private = None
         self._requires = None
@@ -437,46 +925,195 @@ class JavaClassInfo(object):
         parameter and it will not attempt to read the value again.
         """
 
-        # only unpack the magic bytes if it wasn't specified
-        magic = magic or unpacker.unpack_struct(_BBBB)
+        buffered = isinstance(unpacker, BufferUnpacker)
+        if buffered:
+            start = unpacker.offset + (0 if magic else _BBBB.size)
+
+        header = _unpack_class_header(unpacker, self.cpool, magic)
+
+        (self.magic, self.version, self.access_flags,
+         self.this_ref, self.super_ref, self.interfaces) = header
+
+        # unpack fields
+        fields_at = unpacker.offset if buffered else 0
+        self._fields = self._unpack_members(unpacker, False)
+        self._member_indexes = {}
+
+        # unpack methods
+        methods_at = unpacker.offset if buffered else 0
+        self._methods = self._unpack_members(unpacker, True)
+
+        # unpack attributes
+        attribs_at = unpacker.offset if buffered else 0
+        self.attribs.unpack(unpacker)
+
+        if buffered:
+            self._raw = unpacker.data[start:unpacker.offset]
+            self._index = (fields_at - start,
+                           methods_at - start,
+                           attribs_at - start)
+
+
+    def _unpack_members(self, unpacker, is_method):
+        """
+        unpacks a fields or methods table, dropping the private members
+        for the api-only profile
+        """
+
+        members = unpacker.unpack_objects(JavaMemberInfo, self.cpool,
+                                          is_method=is_method,
+                                          ignored=self.attribs.ignored)
+
+        if self.profile == PROFILE_API_ONLY:
+            members = (m for m in members if not m.is_private())
+
+        return tuple(members)
+
+
+    def _unpack_members_at(self, offset, is_method):
+        """
+        unpacks the fields or methods table at offset in the kept class
+        data
+        """
+
+        with BufferUnpacker(self._raw, offset) as up:
+            return self._unpack_members(up, is_method)
+
 
-        if isinstance(magic, (str, buffer)):
-            magic = tuple(ord(m) for m in magic)
+    @property
+    def fields(self):
+        """
+        tuple of JavaMemberInfo instances for the fields of this class
+        """
+
+        fields = self._fields
+        if fields is None:
+            fields = self._unpack_members_at(self._index[0], False)
+            self._fields = fields
+        return fields
+
+
+    @fields.setter
+    def fields(self, fields):
+        self._fields = fields
+        self._member_indexes = {}
+
+
+    @property
+    def methods(self):
+        """
+        tuple of JavaMemberInfo instances for the methods of this class
+        """
+
+        methods = self._methods
+        if methods is None:
+            methods = self._unpack_members_at(self._index[1], True)
+            self._methods = methods
+        return methods
+
+
+    @methods.setter
+    def methods(self, methods):
+        self._methods = methods
+        self._member_indexes = {}
+
+
+    def serialize(self):
+        """
+        the compact binary form of this class, from which
+        deserialize_class can rebuild it. This is the original class
+        data, preceded by a header giving the format version, the
+        unpacking profile, and the offsets of the fields, methods, and
+        attributes tables. Raises a ValueError if this class was not
+        unpacked from a buffer.
+        """
+
+        if self._raw is None:
+            raise ValueError("only classes unpacked from a buffer"
+                             " may be serialized")
+
+        header = _SERIAL_HEADER.pack(_SERIAL_MAGIC, _SERIAL_VERSION,
+                                     _PROFILES.index(self.profile),
+                                     *self._index)
+
+        return b"".join((header, self._raw))
+
+
+    def unpack_serialized(self, raw, index):
+        """
+        Unpacks the header and attributes of a Java class from the
+        class data and table offsets of its serialized form, leaving
+        its fields and methods to be unpacked when first needed.
+        Updates the structure of this instance.
+        """
+
+        with BufferUnpacker(raw) as up:
+            header = _unpack_class_header(up, self.cpool, JAVA_CLASS_MAGIC)
+
+            (self.magic, self.version, self.access_flags,
+             self.this_ref, self.super_ref, self.interfaces) = header
+
+            up.skip(index[2] - up.offset)
+            self.attribs.unpack(up)
+
+        self._fields = None
+        self._methods = None
+        self._member_indexes = {}
+        self._raw = raw
+        self._index = index
+
+
+    def __reduce_ex__(self, protocol):
+        if self._raw is None:
+            # unpacked from a stream, so the class data wasn't kept
+            return object.__reduce_ex__(self, protocol)
         else:
-            magic = tuple(magic)
+            return (deserialize_class, (self.serialize(),))
 
-        if magic != JAVA_CLASS_MAGIC:
-            raise ClassUnpackException("Not a Java class file")
 
-        self.magic = magic
+    def _get_member_index(self, is_method, by_identifier):
+        """
+        dict of the methods or of the fields. If by_identifier, it is
+        of each member by its identifier. Otherwise it is of a tuple of
+        the members with each name, in order.
+        """
 
-        # unpack (minor, major), store as (major, minor)
-        self.version = unpacker.unpack_struct(_HH)[::-1]
+        key = (is_method, by_identifier)
+        index = self._member_indexes.get(key)
+        if index is not None:
+            return index
 
-        # unpack constant pool
-        self.cpool.unpack(unpacker)
+        members = self.methods if is_method else self.fields
 
-        (a, b, c) = unpacker.unpack_struct(_HHH)
-        self.access_flags = a
-        self.this_ref = b
-        self.super_ref = c
+        if by_identifier:
+            index = dict((m.get_identifier(), m) for m in members)
 
-        # unpack interfaces
-        (count,) = unpacker.unpack_struct(_H)
-        self.interfaces = unpacker.unpack(">%iH" % count)
+        else:
+            index = dict()
+            for m in members:
+                index.setdefault(m.get_name(), []).append(m)
+            index = dict((n, tuple(ms)) for n, ms in index.items())
 
-        uobjs = unpacker.unpack_objects
+        self._member_indexes[key] = index
+        return index
 
-        # unpack fields
-        self.fields = tuple(uobjs(JavaMemberInfo,
-                                  self.cpool, is_method=False))
 
-        # unpack methods
-        self.methods = tuple(uobjs(JavaMemberInfo,
-                                   self.cpool, is_method=True))
+    def get_fields_by_identifier(self):
+        """
+        dict of the fields of this class by their identifiers. The
+        dict is kept for later calls, and must not be modified.
+        """
 
-        # unpack attributes
-        self.attribs.unpack(unpacker)
+        return self._get_member_index(False, True)
+
+
+    def get_methods_by_identifier(self):
+        """
+        dict of the methods of this class by their identifiers. The
+        dict is kept for later calls, and must not be modified.
+        """
+
+        return self._get_member_index(True, True)
 
 
     def get_field_by_name(self, name):
@@ -484,10 +1121,8 @@ class JavaClassInfo(object):
         the field member matching name, or None if no such field is found
         """
 
-        for f in self.fields:
-            if f.get_name() == name:
-                return f
-        return None
+        found = self._get_member_index(False, False).get(name)
+        return found[0] if found else None
 
 
     def get_methods_by_name(self, name):
@@ -496,7 +1131,7 @@ class JavaClassInfo(object):
         present.
         """
 
-        return (m for m in self.methods if m.get_name() == name)
+        return iter(self._get_member_index(True, False).get(name, ()))
 
 
     def get_method(self, name, arg_types=()):
@@ -658,11 +1293,8 @@ class JavaClassInfo(object):
             buff = self.get_attribute(java_attr_name)
             if buff is None:
                 annos = tuple()
-
             else:
-                with unpack(buff) as up:
-                    annos = up.unpack_objects(JavaAnnotation, self.cpool)
-                    annos = tuple(annos)
+                annos = JavaAnnotations(self.cpool, buff)
 
             setattr(self, python_attr_name, annos)
 
@@ -671,8 +1303,8 @@ class JavaClassInfo(object):
 
     def get_annotations(self):
         """
-        The RuntimeVisibleAnnotations attribute. A tuple of JavaAnnotation
-        instances
+        The RuntimeVisibleAnnotations attribute. A JavaAnnotations
+        sequence of JavaAnnotation instances, or an empty tuple
 
         reference: http://docs.oracle.com/javase/specs/jvms/se7/html/jvms-4.html#jvms-4.7.16
         """  # noqa
@@ -683,8 +1315,8 @@ class JavaClassInfo(object):
 
     def get_invisible_annotations(self):
         """
-        The RuntimeInvisibleAnnotations attribute. A tuple of
-        JavaAnnotation instances
+        The RuntimeInvisibleAnnotations attribute. A JavaAnnotations
+        sequence of JavaAnnotation instances, or an empty tuple
 
         reference: http://docs.oracle.com/javase/specs/jvms/se7/html/jvms-4.html#jvms-4.7.17
         """  # noqa
@@ -718,7 +1350,7 @@ class JavaClassInfo(object):
         """  # noqa
 
         buff = self.get_attribute("SourceDebugExtension")
-        return (buff and str(buff)) or None
+        return (buff and decode_modified_utf8(buff)) or None
 
 
     def get_innerclasses(self):
@@ -874,76 +1506,105 @@ class JavaClassInfo(object):
 
     def _get_provides(self, private=False):
         """
-        iterator of provided classes, fields, methods
+        iterator of provided classes, fields, methods, as symbols
         """
 
         # TODO I probably need to add inner classes here
 
-        me = self.pretty_this()
-        yield me
+        me = self.get_this()
+        yield (me,)
 
         for field in self.fields:
             if private or field.is_public():
-                yield "%s.%s" % (me, field.pretty_identifier())
+                yield (me, field.get_name(), field.get_descriptor())
 
         for method in self.methods:
             if private or method.is_public():
-                yield "%s.%s" % (me, method.pretty_identifier())
+                yield (me, method.get_name(), method.get_descriptor())
 
 
     def _get_requires(self):
         """
-        iterator of required classes, fields, methods, determined my
-        mining the constant pool for such types
+        iterator of required classes, fields, methods as symbols,
+        determined my mining the constant pool for such types
         """
 
-        provided = set(self.get_provides(private=True))
+        provided = self.get_provides_symbols(private=True)
         cpool = self.cpool
 
-        # loop through the constant pool for API types
-        for i, t, _v in cpool.constants():
+        # loop through the constant pool for API types. Only the
+        # matching entries need to be dereferenced.
+        for i in range(1, len(cpool)):
+            t = cpool.get_const_type(i)
 
-            if t in (CONST_Class, CONST_Fieldref,
-                     CONST_Methodref, CONST_InterfaceMethodref):
+            if t == CONST_Class:
+                sym = (cpool.deref_const(i),)
 
-                # convert this away from unicode so we can
-                pv = str(cpool.pretty_deref_const(i))
+            elif t in (CONST_Fieldref, CONST_Methodref,
+                       CONST_InterfaceMethodref):
+                cn, (n, d) = cpool.deref_const(i)
+                sym = (cn, n, d)
 
-                if pv[0] == "[":
-                    # sometimes when calling operations on an array
-                    # the type embeded in the cpool will be the array
-                    # type, not just the class type. Let's only gather
-                    # the types themselves and ignore the fact that
-                    # the class really wanted an array of them.  In
-                    # the event that this was a method or field on the
-                    # array, we'll throw away that as well, and just
-                    # emit the type contained in the array.
-                    t = _typeseq(pv)
-                    if t[1] == "L":
-                        pv = _pretty_type(t[1:])
-                    else:
-                        pv = None
+            else:
+                continue
 
-                if pv and (pv not in provided):
-                    yield pv
+            if sym[0][0] == "[":
+                # sometimes when calling operations on an array
+                # the type embeded in the cpool will be the array
+                # type, not just the class type. Let's only gather
+                # the types themselves and ignore the fact that
+                # the class really wanted an array of them.  In
+                # the event that this was a method or field on the
+                # array, we'll throw away that as well, and just
+                # emit the type contained in the array.
+                t = sym[0].lstrip("[")
+                if t[0] == "L":
+                    sym = (t[1:-1],)
+                else:
+                    sym = None
 
+            if sym and (sym not in provided):
+                yield sym
 
-    def get_provides(self, ignored=tuple(), private=False):
+
+    def get_provides_symbols(self, private=False):
         """
-        The provided API, including the class itself, its fields, and its
-        methods.
+        frozenset of the provided API as symbols. A class is a 1-tuple
+        of its internal name, and a field or method is a tuple of the
+        internal name of its class, its name, and its descriptor. See
+        pretty_symbol
         """
 
         if private:
             if self._provides_private is None:
-                self._provides_private = set(self._get_provides(True))
-            provides = self._provides_private
+                self._provides_private = frozenset(self._get_provides(True))
+            return self._provides_private
         else:
             if self._provides is None:
-                self._provides = set(self._get_provides(False))
-            provides = self._provides
+                self._provides = frozenset(self._get_provides(False))
+            return self._provides
+
+
+    def get_requires_symbols(self):
+        """
+        frozenset of the required API as symbols, in the same form as
+        get_provides_symbols
+        """
+
+        if self._requires is None:
+            self._requires = frozenset(self._get_requires())
+        return self._requires
+
+
+    def get_provides(self, ignored=tuple(), private=False):
+        """
+        The provided API, including the class itself, its fields, and its
+        methods.
+        """
 
-        return [prov for prov in provides if not fnmatches(prov, *ignored)]
+        provides = self.get_provides_symbols(private)
+        provides = (pretty_symbol(sym) for sym in provides)
+        return PatternSet(ignored).filter_out(provides)
 
 
     def get_requires(self, ignored=tuple()):
@@ -952,11 +1613,8 @@ class JavaClassInfo(object):
         methods that this class references
         """
 
-        if self._requires is None:
-            self._requires = set(self._get_requires())
-
-        requires = self._requires
-        return [req for req in requires if not fnmatches(req, *ignored)]
+        requires = (pretty_symbol(sym) for sym in self.get_requires_symbols())
+        return PatternSet(ignored).filter_out(requires)
 
 
 class JavaMemberInfo(object):
@@ -964,9 +1622,15 @@ class JavaMemberInfo(object):
     A field or method of a java class
     """
 
-    def __init__(self, cpool, is_method=False):
+    __slots__ = ("cpool", "attribs", "is_method", "access_flags",
+                 "name_ref", "descriptor_ref", "annotations",
+                 "invisible_annotations", "parameter_annotations",
+                 "invisible_parameter_annotations")
+
+
+    def __init__(self, cpool, is_method=False, ignored=frozenset()):
         self.cpool = cpool
-        self.attribs = JavaAttributes(cpool)
+        self.attribs = JavaAttributes(cpool, ignored)
         self.access_flags = 0
         self.name_ref = 0
         self.descriptor_ref = 0
@@ -1211,18 +1875,10 @@ class JavaMemberInfo(object):
             buff = self.get_attribute(java_attr_name)
             if buff is None:
                 annos = tuple()
-
+            elif for_params:
+                annos = _unpack_parameter_annotations(self.cpool, buff)
             else:
-                with unpack(buff) as up:
-                    unp = partial(up.unpack_objects,
-                                  JavaAnnotation, self.cpool)
-
-                    if for_params:
-                        (param_count, ) = up.unpack_struct(_B)
-                        annos = (tuple(unp()) for _i in range(param_count))
-                    else:
-                        annos = unp()
-                    annos = tuple(annos)
+                annos = JavaAnnotations(self.cpool, buff)
 
             setattr(self, python_attr_name, annos)
 
@@ -1231,8 +1887,8 @@ class JavaMemberInfo(object):
 
     def get_annotations(self):
         """
-        The RuntimeVisibleAnnotations attribute. A tuple of JavaAnnotation
-        instances
+        The RuntimeVisibleAnnotations attribute. A JavaAnnotations
+        sequence of JavaAnnotation instances, or an empty tuple
 
         reference: http://docs.oracle.com/javase/specs/jvms/se7/html/jvms-4.html#jvms-4.7.16
         """  # noqa
@@ -1243,8 +1899,8 @@ class JavaMemberInfo(object):
 
     def get_invisible_annotations(self):
         """
-        The RuntimeInvisibleAnnotations attribute. A tuple of
-        JavaAnnotation instances
+        The RuntimeInvisibleAnnotations attribute. A JavaAnnotations
+        sequence of JavaAnnotation instances, or an empty tuple
 
         reference: http://docs.oracle.com/javase/specs/jvms/se7/html/jvms-4.html#jvms-4.7.17
         """  # noqa
@@ -1256,7 +1912,7 @@ class JavaMemberInfo(object):
     def get_parameter_annotations(self):
         """
         The RuntimeVisibleParameterAnnotations attribute.  Contains a
-        tuple of JavaAnnotation instances for each param.
+        JavaAnnotations sequence for each param.
 
         reference: http://docs.oracle.com/javase/specs/jvms/se7/html/jvms-4.html#jvms-4.7.18
         """  # noqa
@@ -1268,7 +1924,7 @@ class JavaMemberInfo(object):
     def get_invisible_parameter_annotations(self):
         """
         The RuntimeInvisibleParameterAnnotations attribute.  Contains a
-        tuple of JavaAnnotation instances for each param.
+        JavaAnnotations sequence for each param.
 
         reference: http://docs.oracle.com/javase/specs/jvms/se7/html/jvms-4.html#jvms-4.7.19
         """  # noqa
@@ -1320,12 +1976,27 @@ class JavaMemberInfo(object):
             return None
 
         with unpack(buff) as up:
-            code = JavaCodeInfo(self.cpool)
+            code = JavaCodeInfo(self.cpool, self.attribs.ignored)
             code.unpack(up)
 
         return code
 
 
+    def get_bytecode(self):
+        """
+        the bytecode of this member if it is a non-abstract method, None
+        otherwise. Unlike get_code, the rest of the Code attribute is
+        not unpacked.
+        """
+
+        buff = self.get_attribute("Code")
+        if buff is None:
+            return None
+
+        _max_stack, _max_locals, length = _HHI.unpack_from(buff)
+        return buff[_HHI.size:_HHI.size + length]
+
+
     def get_exceptions(self):
         """
         a tuple of class names for the exception types this method may
@@ -1547,9 +2218,14 @@ class JavaCodeInfo(object):
     reference: http://docs.oracle.com/javase/specs/jvms/se7/html/jvms-4.html#jvms-4.7.3
     """  # noqa
 
-    def __init__(self, cpool):
+    __slots__ = ("cpool", "attribs", "max_stack", "max_locals", "code",
+                 "exceptions", "_dis_code", "_lnt", "_line_index",
+                 "_fingerprints", "_cfg")
+
+
+    def __init__(self, cpool, ignored=frozenset()):
         self.cpool = cpool
-        self.attribs = JavaAttributes(cpool)
+        self.attribs = JavaAttributes(cpool, ignored)
         self.max_stack = 0
         self.max_locals = 0
         self.code = None
@@ -1561,6 +2237,28 @@ class JavaCodeInfo(object):
         # cache of linenumbertable
         self._lnt = None
 
+        # cache of linenumbertable sorted by offset
+        self._line_index = None
+
+        # cache of the raw and dereferenced fingerprints
+        self._fingerprints = [None, None]
+
+        # cache of the control flow graph
+        self._cfg = None
+
+
+    def __getstate__(self):
+        # the caches are left behind, and the code is a view when
+        # unpacked zero-copy, which can't be pickled
+        return (self.cpool, self.attribs, self.max_stack,
+                self.max_locals, _as_bytes(self.code), self.exceptions)
+
+
+    def __setstate__(self, state):
+        self.__init__(state[0])
+        (self.cpool, self.attribs, self.max_stack,
+         self.max_locals, self.code, self.exceptions) = state
+
 
     def deref_const(self, index):
         """
@@ -1596,9 +2294,10 @@ class JavaCodeInfo(object):
         self.attribs.unpack(unpacker)
 
 
-    def get_linenumbertable(self):
+    def get_linenumbertable_columns(self):
         """
-        a sequence of (code_offset, line_number) pairs.
+        a pair of arrays, the code offsets and the line numbers of the
+        line number table.
 
         reference: http://docs.oracle.com/javase/specs/jvms/se7/html/jvms-4.html#jvms-4.7.12
         """  # noqa
@@ -1607,14 +2306,41 @@ class JavaCodeInfo(object):
         if lnt is None:
             buff = self.get_attribute("LineNumberTable")
             if buff is None:
-                lnt = tuple()
+                lnt = (array("H"), array("H"))
             else:
                 with unpack(buff) as up:
-                    lnt = tuple(up.unpack_struct_array(_HH))
+                    lnt = up.unpack_struct_columns(_HH)
             self._lnt = lnt
         return lnt
 
 
+    def get_linenumbertable(self):
+        """
+        a sequence of (code_offset, line_number) pairs.
+
+        reference: http://docs.oracle.com/javase/specs/jvms/se7/html/jvms-4.html#jvms-4.7.12
+        """  # noqa
+
+        return tuple(zip(*self.get_linenumbertable_columns()))
+
+
+    def get_relativelinenumbertable_columns(self):
+        """
+        a pair of arrays, the code offsets and the line numbers of the
+        line number table. Similar to the get_linenumbertable_columns
+        method, but the line numbers start at 0 (they are relative to
+        the method, not to the class file)
+        """
+
+        offsets, lines = self.get_linenumbertable_columns()
+        if lines:
+            lineoff = lines[0]
+            lines = array("i", [line - lineoff for line in lines])
+        else:
+            lines = array("i")
+        return offsets, lines
+
+
     def get_relativelinenumbertable(self):
         """
         a sequence of (code_offset, line_number) pairs. Similar to the
@@ -1622,12 +2348,7 @@ class JavaCodeInfo(object):
         (they are relative to the method, not to the class file)
         """
 
-        lnt = self.get_linenumbertable()
-        if lnt:
-            lineoff = lnt[0][1]
-            return tuple((o, l - lineoff) for (o, l) in lnt)
-        else:
-            return tuple()
+        return tuple(zip(*self.get_relativelinenumbertable_columns()))
 
 
     def get_localvariabletable(self):
@@ -1643,7 +2364,7 @@ class JavaCodeInfo(object):
             return tuple()
 
         with unpack(buff) as up:
-            return tuple(up.unpack_struct_array(_HHHHH))
+            return up.unpack_struct_table(_HHHHH)
 
 
     def get_localvariabletypetable(self):
@@ -1659,12 +2380,32 @@ class JavaCodeInfo(object):
             return tuple()
 
         with unpack(buff) as up:
-            return tuple(up.unpack_struct_array(_HHHHH))
+            return up.unpack_struct_table(_HHHHH)
 
 
-    def get_line_for_offset(self, code_offset):
+    def get_line_index(self):
         """
-        returns the line number given a code offset
+        a pair of arrays, the code offsets and the line numbers of the
+        line number table, if it is sorted by code offset. None if it
+        is not, in which case lines are found by scanning the table in
+        order.
+        """
+
+        index = self._line_index
+        if index is None:
+            offsets, lines = self.get_linenumbertable_columns()
+            if any(a > b for a, b in zip(offsets, offsets[1:])):
+                index = False
+            else:
+                index = (offsets, lines)
+            self._line_index = index
+
+        return index or None
+
+
+    def _scan_line_for_offset(self, code_offset):
+        """
+        get_line_for_offset by a scan of the table in its own order
         """
 
         prev_line = 0
@@ -1677,7 +2418,36 @@ class JavaCodeInfo(object):
             else:
                 return prev_line
 
-        return prev_line
+        return prev_line
+
+
+    def get_line_for_offset(self, code_offset):
+        """
+        returns the line number given a code offset
+        """
+
+        index = self.get_line_index()
+        if index is None:
+            return self._scan_line_for_offset(code_offset)
+
+        offsets, lines = index
+        index = bisect_left(offsets, code_offset)
+        if index < len(offsets) and offsets[index] == code_offset:
+            return lines[index]
+        elif index:
+            return lines[index - 1]
+        else:
+            return 0
+
+
+    def get_instruction_index(self, code_offset):
+        """
+        the index in the disassembly of the instruction at or
+        containing the given code offset
+        """
+
+        offsets = self.get_disassembly().offsets
+        return bisect_right(offsets, code_offset) - 1
 
 
     def iter_code_by_lines(self):
@@ -1686,18 +2456,40 @@ class JavaCodeInfo(object):
          ...)
         """
 
-        lnt = self.get_linenumbertable()
-        if not lnt:
+        _offsets, first_lines = self.get_linenumbertable_columns()
+        if not first_lines:
             yield (None, None, self.disassemble())
             return
 
-        lnt_offset = lnt[0][1]
+        lnt_offset = first_lines[0]
+
+        index = self.get_line_index()
+        if index is None:
+            line_offsets = lines = ()
+            line_count = 0
+        else:
+            line_offsets, lines = index
+            line_count = len(line_offsets)
 
+        # walk the instructions and the sorted line number table
+        # together, the same lookup as get_line_for_offset
+        pos = 0
         cur_line = None
         current = None
 
         for codelet in self.disassemble():
-            abs_line = self.get_line_for_offset(codelet[0])
+            offset = codelet[0]
+            while pos < line_count and line_offsets[pos] < offset:
+                pos += 1
+
+            if index is None:
+                abs_line = self._scan_line_for_offset(offset)
+            elif pos < line_count and line_offsets[pos] == offset:
+                abs_line = lines[pos]
+            elif pos:
+                abs_line = lines[pos - 1]
+            else:
+                abs_line = 0
 
             if cur_line == abs_line:
                 current.append(codelet)
@@ -1712,25 +2504,99 @@ class JavaCodeInfo(object):
             yield (cur_line, cur_line - lnt_offset, current)
 
 
-    def disassemble(self):
+    def fingerprint(self, deref=False):
         """
-        disassembles the underlying bytecode instructions and generates a
-        sequence of (offset, code, args) tuples
+        a hex digest of the instructions. With deref False this covers
+        the opcodes and the raw arguments, so constants are identified
+        by their index into the constant pool. With deref True the
+        constants are identified by their dereferenced values instead,
+        so that code compiled against differently ordered constant
+        pools can still match.
+        """
+
+        which = int(bool(deref))
+        found = self._fingerprints[which]
+        if found is not None:
+            return found
+
+        if not deref:
+            found = sha256(self.code).hexdigest()
+
+        else:
+            # the code with the constant indexes blanked out, followed
+            # by the values of those constants in order
+            deref_const = self.cpool.deref_const
+            masked = bytearray(self.code)
+            consts = list()
+
+            for offset in self.get_disassembly().get_const_offsets():
+                if masked[offset] == OP_ldc:
+                    # the only one with a single byte index
+                    index = masked[offset + 1]
+                    masked[offset + 1] = 0
+                else:
+                    index = (masked[offset + 1] << 8) | masked[offset + 2]
+                    masked[offset + 1:offset + 3] = b"\x00\x00"
+                consts.append(deref_const(index))
+
+            digest = sha256(masked)
+            digest.update(repr(consts).encode("utf8"))
+            found = digest.hexdigest()
+
+        self._fingerprints[which] = found
+        return found
+
+
+    def get_disassembly(self):
+        """
+        the underlying bytecode instructions disassembled into an
+        opcodes.Disassembly
         """
 
         dis = self._dis_code
         if dis is None:
-            dis = tuple(disassemble(self.code))
+            dis = disassemble_arrays(self.code)
             self._dis_code = dis
 
         return dis
 
 
+    def get_cfg(self):
+        """
+        the opcodes.ControlFlowGraph of the basic blocks of this code,
+        including the edges to exception handlers. Constants are hashed
+        by value in its block hashes.
+        """
+
+        cfg = self._cfg
+        if cfg is None:
+            handlers = [(e.start_pc, e.end_pc, e.handler_pc)
+                        for e in self.exceptions]
+            cfg = build_cfg(self.get_disassembly(), handlers,
+                            self.cpool.deref_const)
+            self._cfg = cfg
+
+        return cfg
+
+
+    def disassemble(self):
+        """
+        disassembles the underlying bytecode instructions into a
+        sequence of (offset, code, args) tuples
+        """
+
+        return self.get_disassembly()
+
+
 class JavaExceptionInfo(object):
     """
     Information about an exception handler entry in an exception table
     """
 
+    __slots__ = ("cpool", "code", "start_pc", "end_pc", "handler_pc",
+                 "catch_type_ref")
+
+
     def __init__(self, code):
         self.code = code
         self.cpool = code.cpool
@@ -1813,6 +2679,10 @@ class JavaInnerClassInfo(object):
     reference: http://docs.oracle.com/javase/specs/jvms/se7/html/jvms-4.html#jvms-4.7.6
     """  # noqa
 
+    __slots__ = ("cpool", "inner_info_ref", "outer_info_ref", "name_ref",
+                 "access_flags")
+
+
     def __init__(self, cpool):
         self.cpool = cpool
 
@@ -1843,6 +2713,116 @@ class JavaInnerClassInfo(object):
         return self.cpool.deref_const(self.name_ref)
 
 
+class JavaAnnotations(object):
+    """
+    A table of annotations, such as the body of a
+    RuntimeVisibleAnnotations attribute. It is a sequence of
+    JavaAnnotation instances, which are only unpacked from the raw
+    data of the table when they are first read.
+
+    Two tables compare equal without being unpacked when their raw
+    data is the same and each constant it refers to has the same
+    value in both pools. Otherwise the unpacked annotations are
+    compared.
+    """
+
+    __slots__ = ("cpool", "data", "_annotations", "_const_refs")
+
+
+    def __init__(self, cpool, data):
+        self.cpool = cpool
+        self.data = data
+        self._annotations = None
+        self._const_refs = None
+
+
+    def __reduce__(self):
+        return (JavaAnnotations, (self.cpool, bytes(self.data)))
+
+
+    def get_annotations(self):
+        """
+        tuple of the JavaAnnotation instances of this table
+        """
+
+        annos = self._annotations
+        if annos is None:
+            with unpack(self.data) as up:
+                annos = tuple(up.unpack_objects(JavaAnnotation, self.cpool))
+            self._annotations = annos
+
+        return annos
+
+
+    def get_const_refs(self):
+        """
+        tuple of the constant pool indexes referred to by the raw data,
+        in the order they appear. Found without unpacking the
+        annotations.
+        """
+
+        refs = self._const_refs
+        if refs is None:
+            refs = list()
+            _scan_annotations(self.data, 0, refs)
+            refs = tuple(refs)
+            self._const_refs = refs
+
+        return refs
+
+
+    def _same_data(self, other):
+        """
+        true if both tables have the same raw data, and each constant
+        it refers to has the same value in both pools
+        """
+
+        if self.data != other.data:
+            return False
+
+        if self.cpool is other.cpool:
+            return True
+
+        lconst = self.cpool.deref_const
+        rconst = other.cpool.deref_const
+        return all(lconst(i) == rconst(i) for i in self.get_const_refs())
+
+
+    def __len__(self):
+        return _H.unpack_from(self.data)[0]
+
+
+    def __iter__(self):
+        return iter(self.get_annotations())
+
+
+    def __getitem__(self, index):
+        return self.get_annotations()[index]
+
+
+    def __eq__(self, other):
+        if isinstance(other, JavaAnnotations):
+            if self._same_data(other):
+                return True
+            other = other.get_annotations()
+
+        elif not isinstance(other, tuple):
+            return False
+
+        return self.get_annotations() == other
+
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+
+    __hash__ = None
+
+
+    def __repr__(self):
+        return repr(self.get_annotations())
+
+
 class JavaAnnotation(dict):
     """
     Java Annotations info
@@ -1952,6 +2932,92 @@ def _annotation_val_eq(left_tag, left_data, left_cpool,
         return True
 
 
+def _unpack_parameter_annotations(cpool, data):
+    """
+    tuple of a JavaAnnotations for each parameter in the body of a
+    RuntimeVisibleParameterAnnotations or
+    RuntimeInvisibleParameterAnnotations attribute
+    """
+
+    (param_count, ) = _B.unpack_from(data)
+
+    result = list()
+    offset = 1
+    for _i in range(param_count):
+        end = _scan_annotations(data, offset, list())
+        result.append(JavaAnnotations(cpool, data[offset:end]))
+        offset = end
+
+    return tuple(result)
+
+
+def _scan_annotations(data, offset, refs):
+    """
+    the offset past the table of annotations at offset in data,
+    appending the constant pool indexes it refers to onto refs
+    """
+
+    (count, ) = _H.unpack_from(data, offset)
+    offset += 2
+
+    for _i in range(count):
+        offset = _scan_annotation(data, offset, refs)
+
+    return offset
+
+
+def _scan_annotation(data, offset, refs):
+    """
+    the offset past the annotation at offset in data, appending the
+    constant pool indexes it refers to onto refs
+    """
+
+    type_ref, count = _HH.unpack_from(data, offset)
+    refs.append(type_ref)
+    offset += 4
+
+    for _i in range(count):
+        (key_ref, ) = _H.unpack_from(data, offset)
+        refs.append(key_ref)
+        offset = _scan_annotation_val(data, offset + 2, refs)
+
+    return offset
+
+
+def _scan_annotation_val(data, offset, refs):
+    """
+    the offset past the tag and data pair annotation value at offset
+    in data, appending the constant pool indexes it refers to onto
+    refs
+    """
+
+    (tag, ) = _B.unpack_from(data, offset)
+    tag = chr(tag)
+    offset += 1
+
+    if tag in 'BCDFIJSZsc':
+        (ref, ) = _H.unpack_from(data, offset)
+        refs.append(ref)
+        return offset + 2
+
+    elif tag == 'e':
+        refs.extend(_HH.unpack_from(data, offset))
+        return offset + 4
+
+    elif tag == '@':
+        return _scan_annotation(data, offset, refs)
+
+    elif tag == '[':
+        (count, ) = _H.unpack_from(data, offset)
+        offset += 2
+        for _i in range(count):
+            offset = _scan_annotation_val(data, offset, refs)
+        return offset
+
+    else:
+        raise Unimplemented("Unknown tag {}".format(tag))
+
+
 def _unpack_annotation_val(unpacker, cpool):
     """
     tag, data tuple of an annotation
@@ -2013,6 +3079,74 @@ def _pretty_annotation_val(val, cpool):
     return data
 
 
+class SymbolTable(object):
+    """
+    A table of the symbols of get_provides_symbols and
+    get_requires_symbols, numbering each distinct symbol so that the
+    requires and provides of many classes can be gathered and compared
+    by id. Each id keeps the first instance of its symbol, and its
+    pretty string once rendered.
+    """
+
+    __slots__ = ("_ids", "_symbols", "_pretty")
+
+
+    def __init__(self):
+        self._ids = {}
+        self._symbols = []
+        self._pretty = []
+
+
+    def __len__(self):
+        return len(self._symbols)
+
+
+    def intern(self, symbol):
+        """
+        the id of a symbol, assigning it the next id if it is new
+        """
+
+        ident = self._ids.get(symbol)
+        if ident is None:
+            ident = len(self._symbols)
+            self._ids[symbol] = ident
+            self._symbols.append(symbol)
+            self._pretty.append(None)
+
+        return ident
+
+
+    def get_symbol(self, ident):
+        """
+        the symbol with the given id
+        """
+
+        return self._symbols[ident]
+
+
+    def pretty(self, ident):
+        """
+        the pretty_symbol string of the symbol with the given id
+        """
+
+        result = self._pretty[ident]
+        if result is None:
+            result = pretty_symbol(self._symbols[ident])
+            self._pretty[ident] = result
+
+        return result
+
+
+    def render(self, mapping):
+        """
+        a copy of a dict keyed by ids, keyed instead by the pretty
+        strings of their symbols
+        """
+
+        pretty = self.pretty
+        return dict((pretty(k), v) for k, v in mapping.items())
+
+
 # -----
 # Utility functions for turning major/minor versions into JVM releases
 # Each entry is a tuple of minimum version and maxiumum version,
@@ -2049,59 +3183,198 @@ def platform_from_version(major, minor):
 # Utility functions for the constants pool
 
 
-def _unpack_const_item(unpacker):
+# the Struct for the value following the type byte of each constant
+# pool item type, and whether that value is a single field rather
+# than a tuple. CONST_Utf8 is variably sized, so its Struct is only
+# that of its two byte length.
+_CONST_STRUCTS = {
+    CONST_Utf8: (_H, True),
+    CONST_Integer: (compile_struct(">i"), True),
+    CONST_Float: (compile_struct(">f"), True),
+    CONST_Long: (compile_struct(">q"), True),
+    CONST_Double: (compile_struct(">d"), True),
+    CONST_Class: (_H, True),
+    CONST_String: (_H, True),
+    CONST_Fieldref: (_HH, False),
+    CONST_Methodref: (_HH, False),
+    CONST_InterfaceMethodref: (_HH, False),
+    CONST_NameAndType: (_HH, False),
+    CONST_ModuleId: (_HH, False),
+    CONST_MethodHandle: (_BH, False),
+    CONST_MethodType: (_H, True),
+    CONST_InvokeDynamic: (_HH, False),
+}
+
+
+# the size of the data following the type byte of each constant pool
+# item type. For CONST_Utf8 this is only the size of its length.
+_CONST_SIZES = dict((t, st.size) for t, (st, _s) in _CONST_STRUCTS.items())
+
+
+def _index_const_items(data, offset, count):
     """
-    unpack a constant pool item, which will consist of a type byte
-    (see the CONST_ values in this module) and a value of the
-    appropriate type
+    a single pass over the count constant pool items (including the
+    never-present zero-th item) in data starting at offset, noting
+    only their types and locations. Returns a tuple of a bytearray of
+    the types (zero for unused slots), an array of the offsets of the
+    items relative to the starting offset, and the total size of the
+    items.
     """
 
-    (typecode,) = unpacker.unpack_struct(_B)
+    tags = bytearray(count)
+    offsets = array("L", (0,)) * count
+    sizes = _CONST_SIZES
 
-    if typecode == CONST_Utf8:
-        (slen,) = unpacker.unpack_struct(_H)
-        val = unpacker.read(slen)
-        try:
-            val = val.decode("utf8")
-        except UnicodeDecodeError:
-            # easiest hack to handle java's modified utf-8 encoding
-            val = val.replace(b"\xC0\x80", b"\x00").decode("utf8")
+    start = offset
+    avail = len(data)
 
-    elif typecode == CONST_Integer:
-        (val,) = unpacker.unpack(">i")
+    i = 1
+    while i < count:
+        if offset >= avail:
+            raise UnpackException(">B", 1, 0)
 
-    elif typecode == CONST_Float:
-        (val,) = unpacker.unpack(">f")
+        typecode = data[offset]
+        size = sizes.get(typecode)
+        if size is None:
+            raise Unimplemented("unknown constant type %r" % typecode)
 
-    elif typecode == CONST_Long:
-        (val,) = unpacker.unpack(">q")
+        if typecode == CONST_Utf8 and offset + 3 <= avail:
+            size += (data[offset + 1] << 8) | data[offset + 2]
 
-    elif typecode == CONST_Double:
-        (val,) = unpacker.unpack(">d")
+        if offset + 1 + size > avail:
+            raise UnpackException(None, size, avail - offset - 1)
 
-    elif typecode in (CONST_Class, CONST_String, CONST_MethodType):
-        (val,) = unpacker.unpack_struct(_H)
+        tags[i] = typecode
+        offsets[i] = offset - start
+        offset += 1 + size
 
-    elif typecode in (CONST_Fieldref, CONST_Methodref,
-                      CONST_InterfaceMethodref, CONST_NameAndType,
-                      CONST_ModuleId, CONST_InvokeDynamic):
-        val = unpacker.unpack_struct(_HH)
+        # Long and Double const types will "consume" an item count,
+        # but not data
+        if typecode in (CONST_Long, CONST_Double):
+            i += 2
+        else:
+            i += 1
 
-    elif typecode == CONST_MethodHandle:
-        val = unpacker.unpack_struct(_BH)
+    return tags, offsets, offset - start
 
-    elif typecode == CONST_MethodType:
-        val = unpacker.unpack_struct(_H)
 
-    elif typecode == CONST_InvokeDynamic:
-        val = unpacker.unpack_struct(_HH)
+def _read_const_items(unpacker, count):
+    """
+    reads the raw data of the count constant pool items (including
+    the never-present zero-th item) from an unpacker which can only
+    be read in sequence, so that it may be indexed afterwards.
+    """
 
-    else:
+    sizes = _CONST_SIZES
+    data = bytearray()
+
+    i = 1
+    while i < count:
+        (typecode,) = unpacker.unpack_struct(_B)
+        size = sizes.get(typecode)
+        if size is None:
+            raise Unimplemented("unknown constant type %r" % typecode)
+
+        data.append(typecode)
+        if typecode == CONST_Utf8:
+            (slen,) = unpacker.unpack_struct(_H)
+            data.extend(_H.pack(slen))
+            data.extend(unpacker.read(slen))
+        else:
+            data.extend(unpacker.read(size))
+
+        if typecode in (CONST_Long, CONST_Double):
+            i += 2
+        else:
+            i += 1
+
+    return bytes(data)
+
+
+def _unpack_const_item(data, offset):
+    """
+    unpack the constant pool item at offset in data, which will
+    consist of a type byte (see the CONST_ values in this module) and
+    a value of the appropriate type
+    """
+
+    typecode = data[offset]
+    entry = _CONST_STRUCTS.get(typecode)
+    if entry is None:
         raise Unimplemented("unknown constant type %r" % typecode)
 
+    struct, single = entry
+    offset += 1
+
+    if typecode == CONST_Utf8:
+        (slen,) = struct.unpack_from(data, offset)
+        offset += 2
+        val = decode_modified_utf8(data[offset:offset + slen])
+
+    elif single:
+        (val,) = struct.unpack_from(data, offset)
+
+    else:
+        val = struct.unpack_from(data, offset)
+
     return typecode, val
 
 
+def _as_bytes(data):
+    """
+    data as bytes if it is a memoryview, such as the slices of a class
+    unpacked zero-copy, otherwise data unchanged
+    """
+
+    if isinstance(data, memoryview):
+        return data.tobytes()
+    return data
+
+
+# the first byte which isn't ASCII, and the sequences which differ
+# between modified UTF-8 and UTF-8: an encoded NUL, or the lead of an
+# encoded surrogate
+_NON_ASCII = re.compile(b"[\x80-\xff]")
+_MUTF8_SPECIAL = re.compile(b"\xc0\x80|\xed[\xa0-\xbf]")
+
+
+def decode_modified_utf8(data, intern=False):
+    """
+    decode a bytes or memoryview value from Java's modified UTF-8
+    encoding, in which NUL is encoded as the two bytes C0 80 and
+    supplementary characters are encoded as a pair of three byte
+    surrogates. Unpaired surrogates are preserved as such.
+
+    If intern is True, the resulting string is interned.
+
+    reference: http://docs.oracle.com/javase/specs/jvms/se7/html/jvms-4.html#jvms-4.4.7
+    """  # noqa
+
+    found = _NON_ASCII.search(data)
+    if found is None:
+        # the common case, which is decoded from the view in place
+        val = codecs.decode(data, "ascii")
+
+    elif _MUTF8_SPECIAL.search(data, found.start()) is None:
+        # without encoded NULs or surrogates the value is also valid
+        # UTF-8
+        val = codecs.decode(data, "utf8")
+
+    else:
+        val = bytes(data).replace(b"\xC0\x80", b"\x00")
+        val = val.decode("utf8", "surrogatepass")
+
+        # the surrogates have been decoded individually, so pass the
+        # string through UTF-16 in order to combine the pairs
+        val = val.encode("utf-16-le", "surrogatepass")
+        val = val.decode("utf-16-le", "surrogatepass")
+
+    if intern:
+        val = _intern(val)
+
+    return val
+
+
 def _pretty_const_type_val(typecode, val):
     """
     given a typecode and a value, returns the appropriate pretty
@@ -2167,6 +3440,28 @@ def _pretty_const_type_val(typecode, val):
 # "pretty" strings
 
 
+# the bound on each of the caches of parsed descriptors
+DESCRIPTOR_CACHE_SIZE = 2 ** 14
+
+
+def descriptor_cache_info():
+    """
+    dict of the hit and miss counts of the descriptor parsing caches,
+    as functools CacheInfo tuples by function name
+    """
+
+    return dict((fn.__name__, fn.cache_info()) for fn in _DESCRIPTOR_CACHED)
+
+
+def clear_descriptor_caches():
+    """
+    empty the descriptor parsing caches and reset their counts
+    """
+
+    for fn in _DESCRIPTOR_CACHED:
+        fn.cache_clear()
+
+
 def pretty_generic(signature):
     """
     Pretty version of the given generics signature
@@ -2177,6 +3472,24 @@ def pretty_generic(signature):
     return signature
 
 
+def pretty_symbol(symbol):
+    """
+    Pretty version of a symbol from get_provides_symbols or
+    get_requires_symbols, as given by get_provides and get_requires
+    """
+
+    cn = _pretty_class(symbol[0])
+    if len(symbol) == 1:
+        return cn
+
+    _c, name, desc = symbol
+    if desc[0] == "(":
+        args, ret = _pretty_typeseq(desc)
+        return "%s.%s%s:%s" % (cn, name, args, ret)
+    else:
+        return "%s.%s:%s" % (cn, name, _pretty_type(desc))
+
+
 def _next_argsig(s):
     """
     given a string, find the next complete argument signature and
@@ -2217,6 +3530,7 @@ def _typeseq_iter(s):
         yield t
 
 
+@lru_cache(maxsize=DESCRIPTOR_CACHE_SIZE)
 def _typeseq(type_s):
     """
     tuple version of _typeseq_iter
@@ -2225,14 +3539,16 @@ def _typeseq(type_s):
     return tuple(_typeseq_iter(type_s))
 
 
+@lru_cache(maxsize=DESCRIPTOR_CACHE_SIZE)
 def _pretty_typeseq(type_s):
     """
-    iterator of pretty versions of _typeseq_iter
+    tuple of pretty versions of _typeseq_iter
     """
 
-    return (_pretty_type(t) for t in _typeseq(type_s))
+    return tuple(_pretty_type(t) for t in _typeseq(type_s))
 
 
+@lru_cache(maxsize=DESCRIPTOR_CACHE_SIZE)
 def _pretty_type(s, offset=0):
     # pylint: disable=R0911, R0912
     # too many returns, too many branches. Not converting this to a
@@ -2297,6 +3613,12 @@ def _pretty_class(s):
     return s.replace("/", ".")
 
 
+# the cached parsers, for descriptor_cache_info and
+# clear_descriptor_caches. _next_argsig is only ever reached through
+# the cache of _typeseq
+_DESCRIPTOR_CACHED = (_typeseq, _pretty_typeseq, _pretty_type)
+
+
 # -----
 # Functions for dealing with buffers and files
 
@@ -2332,7 +3654,7 @@ def is_class_file(filename):
         return tuple(c) == JAVA_CLASS_MAGIC
 
 
-def unpack_class(data, magic=None):
+def unpack_class(data, magic=None, interns=None, profile=PROFILE_FULL):
     """
     unpacks a Java class from data, which can be a string, a buffer,
     or a stream supporting the read method. Returns a populated
@@ -2343,31 +3665,102 @@ def unpack_class(data, magic=None):
     In this case, pass those magic bytes as a str or tuple and the
     unpacker will not attempt to read them again.
 
+    When data is a string or buffer, it is unpacked without copying:
+    attribute bodies and method code of the returned JavaClassInfo are
+    memoryview slices of data, which will be kept alive as long as
+    they are referenced.
+
+    interns is an optional dict shared between many calls, through
+    which the Utf8 constants (and hence the attribute names, member
+    names, and descriptors) of the unpacked classes are deduplicated.
+
+    profile is one of the PROFILE_ values, and decides which parts of
+    the class are unpacked. PROFILE_FULL unpacks everything.
+    PROFILE_NO_DEBUG drops the LineNumberTable, LocalVariableTable,
+    LocalVariableTypeTable, and SourceDebugExtension attributes.
+    PROFILE_NO_CODE also drops the Code attribute of methods.
+    PROFILE_API_ONLY also drops the private fields and methods, which
+    makes the result unsuitable for get_requires and for
+    get_provides(private=True).
+
     Raises a ClassUnpackException or an UnpackException if the class
     data is malformed. Raises Unimplemented if a feature is discovered
     which isn't understood by javatools yet.
     """
 
-    with unpack(data) as up:
+    with unpack(data, zero_copy=True) as up:
         magic = magic or up.unpack_struct(_BBBB)
         if magic != JAVA_CLASS_MAGIC:
             raise ClassUnpackException("Not a Java class file")
 
-        o = JavaClassInfo()
+        o = JavaClassInfo(interns, profile)
+        o.unpack(up, magic=magic)
+
+    return o
+
+
+def unpack_class_header(data, magic=None):
+    """
+    unpacks only the header of a Java class from data, which can be a
+    string, a buffer, or a stream supporting the read method. Returns
+    a populated JavaClassHeader instance. Unpacking stops after the
+    class's interfaces, so its fields, methods, and attributes are
+    never looked at.
+
+    As with unpack_class, if data is a stream which has already had
+    the magic bytes read off of it they may be passed via magic.
+
+    Raises a ClassUnpackException or an UnpackException if the class
+    data is malformed.
+    """
+
+    with unpack(data, zero_copy=True) as up:
+        o = JavaClassHeader()
         o.unpack(up, magic=magic)
 
     return o
 
 
-def unpack_classfile(filename):
+def deserialize_class(data, interns=None):
+    """
+    rebuilds a JavaClassInfo from the bytes or buffer returned by its
+    serialize method. The class data is not copied, and only the
+    header and attributes of the class are unpacked up front. interns
+    is as for unpack_class.
+
+    Raises a ClassUnpackException if data is not a serialized class of
+    a supported format version.
+    """
+
+    data = memoryview(data)
+    size = _SERIAL_HEADER.size
+    if len(data) < size:
+        raise ClassUnpackException("Not a serialized Java class")
+
+    header = _SERIAL_HEADER.unpack_from(data)
+    magic, version, profile = header[:3]
+
+    if magic != _SERIAL_MAGIC:
+        raise ClassUnpackException("Not a serialized Java class")
+    if version != _SERIAL_VERSION:
+        raise ClassUnpackException("Unsupported serialized Java class"
+                                   " version %i" % version)
+
+    o = JavaClassInfo(interns, _PROFILES[profile])
+    o.unpack_serialized(data[size:], header[3:])
+    return o
+
+
+def unpack_classfile(filename, interns=None, profile=PROFILE_FULL):
     """
     returns a newly allocated JavaClassInfo object populated with the
     data unpacked from the specified file. Raises an UnpackException
-    if the class data is malformed
+    if the class data is malformed. interns and profile are as for
+    unpack_class
     """
 
     with open(filename, "rb", _BUFFERING) as fd:
-        return unpack_class(fd.read())
+        return unpack_class(fd.read(), interns=interns, profile=profile)
 
 
 #
@@ -0,0 +1,248 @@
+# This library is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as
+# published by the Free Software Foundation; either version 3 of the
+# License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, see
+# <http://www.gnu.org/licenses/>.
+
+
+"""
+A persistent on-disk cache of summaries of Java classes, so that the
+results of parsing the same classes over and over (as when the same
+third-party jars are inspected on every build) can be looked up rather
+than recomputed.
+
+Summaries are keyed by the content of the class, either via the
+SHA-256 digest of its bytes or via the CRC and size recorded for it in
+a zip file.
+
+:license: LGPL
+"""
+
+
+from hashlib import sha256
+from json import dump, load
+from os import listdir, remove, replace, stat, utime
+from os.path import join
+from tempfile import mkstemp
+
+from .dirutils import makedirsp
+
+
+__all__ = (
+    "ClassCache", "DEFAULT_MAX_SIZE",
+    "class_summary", "summary_symbols", "digest_key", "zip_info_key",
+)
+
+
+# the default limit on the total size of a cache directory
+DEFAULT_MAX_SIZE = 2 ** 28
+
+
+# changed whenever the content of the summaries changes, so that
+# stale entries are treated as misses
+SUMMARY_VERSION = 3
+
+
+_SUFFIX = ".json"
+
+
+def digest_key(data):
+    """
+    cache key for the class data in the given bytes or buffer
+    """
+
+    return "sha256-" + sha256(data).hexdigest()
+
+
+def zip_info_key(info):
+    """
+    cache key for the class described by the given ZipInfo, from its
+    CRC and uncompressed size
+    """
+
+    return "crc-%08x-%i" % (info.CRC & 0xffffffff, info.file_size)
+
+
+def _symbol_lists(symbols):
+    """
+    sorted list of the given symbols as lists, as they are stored in
+    JSON
+    """
+
+    return [list(sym) for sym in sorted(symbols)]
+
+
+def class_summary(info):
+    """
+    a dict of the results of the expensive queries on a JavaClassInfo
+    which may be stored in a ClassCache. These are its provides (both
+    public and private) and its requires as symbols (see
+    summary_symbols), the identifiers of its fields
+    and methods, and the dereferenced fingerprint of the code of each
+    of its methods.
+    """
+
+    code = {}
+    for method in info.methods:
+        body = method.get_code()
+        if body is not None:
+            code[method.get_identifier()] = body.fingerprint(True)
+
+    return {
+        "version": SUMMARY_VERSION,
+        "provides": _symbol_lists(info.get_provides_symbols(False)),
+        "provides_private": _symbol_lists(info.get_provides_symbols(True)),
+        "requires": _symbol_lists(info.get_requires_symbols()),
+        "fields": [f.get_identifier() for f in info.fields],
+        "methods": [m.get_identifier() for m in info.methods],
+        "code": code,
+    }
+
+
+def summary_symbols(summary):
+    """
+    tuple of the requires, the provides, and the private provides of a
+    summary, as the symbols of JavaClassInfo.get_requires_symbols and
+    JavaClassInfo.get_provides_symbols. The symbols are stored as JSON
+    arrays, so they are converted back into tuples here.
+    """
+
+    return (
+        [tuple(sym) for sym in summary["requires"]],
+        [tuple(sym) for sym in summary["provides"]],
+        [tuple(sym) for sym in summary["provides_private"]],
+    )
+
+
+class ClassCache(object):
+    """
+    A directory of class summaries, one JSON file per key. Reading an
+    entry marks it as recently used, and when the directory grows past
+    max_size bytes the least recently used entries are removed.
+    """
+
+    def __init__(self, path, max_size=DEFAULT_MAX_SIZE):
+        self.path = path
+        self.max_size = max_size
+
+        # total size of the entries, found when first needed
+        self._size = None
+
+        makedirsp(path)
+
+
+    def _entry_path(self, key):
+        return join(self.path, key + _SUFFIX)
+
+
+    def get(self, key):
+        """
+        the summary stored for key, or None if there isn't one
+        """
+
+        filename = self._entry_path(key)
+
+        try:
+            with open(filename, "rt") as fd:
+                summary = load(fd)
+            utime(filename, None)
+
+        except (EnvironmentError, ValueError):
+            return None
+
+        if summary.get("version") != SUMMARY_VERSION:
+            return None
+
+        return summary
+
+
+    def put(self, key, summary):
+        """
+        store the summary for key, evicting older entries if the cache
+        is then too large
+        """
+
+        fd, tmpname = mkstemp(suffix=".tmp", dir=self.path)
+        with open(fd, "wt") as out:
+            dump(summary, out, sort_keys=True)
+
+        filename = self._entry_path(key)
+
+        # an entry being rewritten no longer counts towards the size
+        if self._size is not None:
+            try:
+                self._size -= stat(filename).st_size
+            except EnvironmentError:
+                pass
+
+        replace(tmpname, filename)
+
+        if self._size is None:
+            self._size = sum(size for _m, size, _f in self._entries())
+        else:
+            self._size += stat(filename).st_size
+
+        if self._size > self.max_size:
+            self.evict()
+
+
+    def get_summary(self, key, load_class):
+        """
+        the summary for key. If it isn't in the cache, load_class is
+        called to get the JavaClassInfo to summarize, and the summary
+        is stored.
+        """
+
+        summary = self.get(key)
+        if summary is None:
+            summary = class_summary(load_class())
+            self.put(key, summary)
+        return summary
+
+
+    def _entries(self):
+        """
+        sequence of (mtime, size, filename) of the cache entries
+        """
+
+        for name in listdir(self.path):
+            if name.endswith(_SUFFIX):
+                filename = join(self.path, name)
+                try:
+                    st = stat(filename)
+                except EnvironmentError:
+                    continue
+                yield st.st_mtime, st.st_size, filename
+
+
+    def evict(self):
+        """
+        remove the least recently used entries until the cache is no
+        larger than max_size
+        """
+
+        entries = sorted(self._entries())
+        size = sum(entry[1] for entry in entries)
+
+        for _mtime, esize, filename in entries:
+            if size <= self.max_size:
+                break
+            try:
+                remove(filename)
+            except EnvironmentError:
+                continue
+            size -= esize
+
+        self._size = size
+
+
+#
+# The end.
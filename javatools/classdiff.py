@@ -28,8 +28,8 @@ added fields or methods, deprecation changes, etc.
 import sys
 
 from abc import ABCMeta
+from array import array
 from argparse import ArgumentParser, Action
-from six import add_metaclass
 
 from . import unpack_classfile
 from .change import GenericChange, SuperChange
@@ -199,8 +199,7 @@ class ClassSignatureChange(GenericChange):
         return c.pretty_signature()
 
 
-@add_metaclass(ABCMeta)
-class AnnotationsChange(GenericChange):
+class AnnotationsChange(GenericChange, metaclass=ABCMeta):
 
     label = "Runtime annotations"
 
@@ -214,8 +213,7 @@ class AnnotationsChange(GenericChange):
         return [anno.pretty_annotation() for anno in annos]
 
 
-@add_metaclass(ABCMeta)
-class InvisibleAnnotationsChange(AnnotationsChange):
+class InvisibleAnnotationsChange(AnnotationsChange, metaclass=ABCMeta):
 
     label = "Runtime Invisible annotations"
 
@@ -249,8 +247,7 @@ class ClassInfoChange(SuperChange):
                     ClassSignatureChange)
 
 
-@add_metaclass(ABCMeta)
-class MemberSuperChange(SuperChange):
+class MemberSuperChange(SuperChange, metaclass=ABCMeta):
     """
     basis for FieldChange and MethodChange
     """
@@ -262,8 +259,7 @@ class MemberSuperChange(SuperChange):
         return "%s: %s" % (self.label, self.ldata.pretty_descriptor())
 
 
-@add_metaclass(ABCMeta)
-class MemberAdded(Addition):
+class MemberAdded(Addition, metaclass=ABCMeta):
     """
     basis for FieldAdded and MethodAdded
     """
@@ -275,8 +271,7 @@ class MemberAdded(Addition):
         return "%s: %s" % (self.label, self.rdata.pretty_descriptor())
 
 
-@add_metaclass(ABCMeta)
-class MemberRemoved(Removal):
+class MemberRemoved(Removal, metaclass=ABCMeta):
     """
     basis for FieldChange and MethodChange
     """
@@ -288,8 +283,7 @@ class MemberRemoved(Removal):
         return "%s: %s" % (self.label, self.ldata.pretty_descriptor())
 
 
-@add_metaclass(ABCMeta)
-class ClassMembersChange(SuperChange):
+class ClassMembersChange(SuperChange, metaclass=ABCMeta):
     """
     basis for ClassFieldsChange and ClassMethodsChange
     """
@@ -301,24 +295,29 @@ class ClassMembersChange(SuperChange):
     member_changed = MemberSuperChange
 
 
-    def collect_impl(self):
-        li = {}
+    def get_member_indexes(self):
+        """
+        pair of dicts of the left and right members by identifier
+        """
+
+        return (dict((m.get_identifier(), m) for m in self.ldata),
+                dict((m.get_identifier(), m) for m in self.rdata))
+
 
-        for member in self.ldata:
-            li[member.get_identifier()] = member
+    def collect_impl(self):
+        left, right = self.get_member_indexes()
 
-        for member in self.rdata:
-            key = member.get_identifier()
-            lf = li.get(key, None)
+        for key, member in right.items():
+            lf = left.get(key, None)
 
             if lf:
-                del li[key]
                 yield self.member_changed(lf, member)
             else:
                 yield self.member_added(None, member)
 
-        for member in li.values():
-            yield self.member_removed(member, None)
+        for key, member in left.items():
+            if key not in right:
+                yield self.member_removed(member, None)
 
 
 class CodeAbsoluteLinesChange(GenericChange):
@@ -327,6 +326,13 @@ class CodeAbsoluteLinesChange(GenericChange):
 
 
     def fn_data(self, c):
+        # compared as columns, which is much cheaper than as pairs
+        if c is None:
+            return (array("H"), array("H"))
+        return c.get_linenumbertable_columns()
+
+
+    def fn_pretty(self, c):
         return (c and c.get_linenumbertable()) or tuple()
 
 
@@ -341,6 +347,12 @@ class CodeRelativeLinesChange(GenericChange):
 
 
     def fn_data(self, c):
+        if c is None:
+            return (array("H"), array("i"))
+        return c.get_relativelinenumbertable_columns()
+
+
+    def fn_pretty(self, c):
         return (c and c.get_relativelinenumbertable()) or tuple()
 
 
@@ -435,11 +447,18 @@ class CodeConstantsChange(GenericChange):
             # code body change, can't determine constants
             return True, None
 
-        for l, r in zip(left.disassemble(), right.disassemble()):
-            if not ((l[0] == r[0]) and (l[1] == r[1])):
-                # code body change, can't determine constants
-                return True, None
+        if left.fingerprint(True) == right.fingerprint(True):
+            # same instructions and the same constants
+            self.offsets = list()
+            return False, None
 
+        ldis = left.get_disassembly()
+        rdis = right.get_disassembly()
+        if ldis.offsets != rdis.offsets or ldis.opcodes != rdis.opcodes:
+            # code body change, can't determine constants
+            return True, None
+
+        for l, r in zip(ldis, rdis):
             largs = l[2]
             rargs = r[2]
 
@@ -489,9 +508,13 @@ class CodeBodyChange(GenericChange):
                    (len(left.code), len(right.code))
             return True, desc
 
-        for l, r in zip(left.disassemble(), right.disassemble()):
-            if not ((l[0] == r[0]) and (l[1] == r[1])):
-                return True, None
+        if left.fingerprint() == right.fingerprint():
+            return False, None
+
+        ldis = left.get_disassembly()
+        rdis = right.get_disassembly()
+        if ldis.offsets != rdis.offsets or ldis.opcodes != rdis.opcodes:
+            return True, None
 
         return False, None
 
@@ -796,6 +819,19 @@ class ClassFieldsChange(ClassMembersChange):
     def __init__(self, lclass, rclass):
         super(ClassFieldsChange, self).__init__(lclass.fields,
                                                 rclass.fields)
+        self.lclass = lclass
+        self.rclass = rclass
+
+
+    def get_member_indexes(self):
+        return (self.lclass.get_fields_by_identifier(),
+                self.rclass.get_fields_by_identifier())
+
+
+    def clear(self):
+        super(ClassFieldsChange, self).clear()
+        self.lclass = None
+        self.rclass = None
 
 
 class MethodAdded(MemberAdded):
@@ -826,6 +862,19 @@ class ClassMethodsChange(ClassMembersChange):
     def __init__(self, lclass, rclass):
         super(ClassMethodsChange, self).__init__(lclass.methods,
                                                  rclass.methods)
+        self.lclass = lclass
+        self.rclass = rclass
+
+
+    def get_member_indexes(self):
+        return (self.lclass.get_methods_by_identifier(),
+                self.rclass.get_methods_by_identifier())
+
+
+    def clear(self):
+        super(ClassMethodsChange, self).clear()
+        self.lclass = None
+        self.rclass = None
 
 
 class ClassConstantPoolChange(GenericChange):
@@ -894,8 +943,8 @@ def pretty_merge_constants(left_cpool, right_cpool):
     type and pretty value for indexes past its end
     """
 
-    lsize = len(left_cpool.consts)
-    rsize = len(right_cpool.consts)
+    lsize = len(left_cpool)
+    rsize = len(right_cpool)
 
     index = 1
     for index in range(1, min(lsize, rsize)):
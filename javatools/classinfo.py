@@ -31,7 +31,6 @@ import javatools.opcodes as opcodes
 
 from argparse import ArgumentParser
 from json import dump
-from six.moves import range
 
 from . import platform_from_version, unpack_classfile
 
@@ -257,7 +256,7 @@ def cli_print_classinfo(options, info):
         # generator skips them.
         cpool = info.cpool
 
-        for i in range(1, len(cpool.consts)):
+        for i in range(1, len(cpool)):
             t, v = cpool.pretty_const(i)
             if t:
                 # skipping the None consts, which would be the entries
@@ -22,10 +22,13 @@ trees
 """
 
 
+import re
+
 from filecmp import dircmp
-from fnmatch import fnmatch
+from fnmatch import translate
+from functools import lru_cache
 from os import makedirs, walk
-from os.path import exists, isdir, join, relpath
+from os.path import exists, isdir, join, normcase, relpath
 from shutil import copy
 
 
@@ -36,16 +39,117 @@ SAME = "same"
 BOTH = SAME  # meh, synonyms
 
 
+# whether fnmatch would fold the case of names and patterns on this
+# platform
+_FOLD_CASE = normcase("A") != "A"
+
+
+_GLOB_CHARS = re.compile(r"[*?[]")
+
+
+class PatternSet(object):
+    """
+    A compiled set of glob patterns, matching an entry if any one of
+    them would under fnmatch. Patterns without wildcards are looked
+    up in a set, patterns which are a literal ending or starting with
+    a single '*' (such as "java.*" or "*.class") are checked as a
+    prefix or suffix, and the remaining patterns are merged into one
+    regular expression, so that an entry is matched against the whole
+    set in a single pass.
+
+    The patterns may include other PatternSet instances, whose
+    patterns are merged in. Empty patterns are ignored.
+    """
+
+    __slots__ = ("patterns", "_literals", "_prefixes", "_suffixes",
+                 "_regex")
+
+
+    def __init__(self, patterns=()):
+        merged = list()
+        for pattern in patterns:
+            if isinstance(pattern, PatternSet):
+                merged.extend(pattern.patterns)
+            elif pattern:
+                merged.append(pattern)
+
+        literals = set()
+        prefixes = list()
+        suffixes = list()
+        globs = list()
+
+        for pattern in merged:
+            if _FOLD_CASE:
+                pattern = normcase(pattern)
+
+            if not _GLOB_CHARS.search(pattern):
+                literals.add(pattern)
+            elif not _GLOB_CHARS.search(pattern[:-1]) and pattern[-1] == "*":
+                prefixes.append(pattern[:-1])
+            elif not _GLOB_CHARS.search(pattern[1:]) and pattern[0] == "*":
+                suffixes.append(pattern[1:])
+            else:
+                globs.append(translate(pattern))
+
+        self.patterns = tuple(merged)
+        self._literals = frozenset(literals)
+        self._prefixes = tuple(prefixes)
+        self._suffixes = tuple(suffixes)
+        self._regex = re.compile("|".join(globs)).match if globs else None
+
+
+    def __len__(self):
+        return len(self.patterns)
+
+
+    def __repr__(self):
+        return "PatternSet(%r)" % (self.patterns, )
+
+
+    def matches(self, entry):
+        """
+        true if entry matches any of the patterns
+        """
+
+        if _FOLD_CASE:
+            entry = normcase(entry)
+
+        if entry in self._literals:
+            return True
+
+        if entry.startswith(self._prefixes) or entry.endswith(self._suffixes):
+            return True
+
+        regex = self._regex
+        return regex is not None and regex(entry) is not None
+
+
+    def filter_out(self, entries):
+        """
+        list of the entries which match none of the patterns
+        """
+
+        if not self.patterns:
+            return list(entries)
+
+        matches = self.matches
+        return [entry for entry in entries if not matches(entry)]
+
+
+@lru_cache(maxsize=256)
+def _pattern_set(pattern_list):
+    return PatternSet(pattern_list)
+
+
 def fnmatches(entry, *pattern_list):
     """
     returns true if entry matches any of the glob patterns, false
-    otherwise
+    otherwise. The patterns may also be given as PatternSet
+    instances, and the PatternSet of each distinct pattern list is
+    kept for reuse.
     """
 
-    for pattern in pattern_list:
-        if pattern and fnmatch(entry, pattern):
-            return True
-    return False
+    return _pattern_set(pattern_list).matches(entry)
 
 
 def makedirsp(dirname):
@@ -107,7 +211,7 @@ def _gen_from_dircmp(dc, lpath, rpath):
             for r, _ds, fs in walk(fp):
                 r = relpath(r, lpath)
                 for f in fs:
-                    yield(LEFT, join(r, f))
+                    yield (LEFT, join(r, f))
         else:
             yield (LEFT, relpath(fp, lpath))
 
@@ -120,7 +224,7 @@ def _gen_from_dircmp(dc, lpath, rpath):
             for r, _ds, fs in walk(fp):
                 r = relpath(r, rpath)
                 for f in fs:
-                    yield(RIGHT, join(r, f))
+                    yield (RIGHT, join(r, f))
         else:
             yield (RIGHT, relpath(fp, rpath))
 
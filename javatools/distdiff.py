@@ -28,16 +28,16 @@ be checked for deep differences.
 import sys
 
 from argparse import ArgumentParser
+from itertools import zip_longest
 from multiprocessing import cpu_count
 from os.path import join
-from six.moves import range, zip_longest
 
 from . import unpack_classfile
 from .change import GenericChange, SuperChange, Addition, Removal
 from .change import squash, yield_sorted_by_type
 from .classdiff import JavaClassChange, JavaClassReport
 from .classdiff import add_classdiff_optgroup, add_general_optgroup
-from .dirutils import compare, fnmatches
+from .dirutils import PatternSet, compare, fnmatches
 from .dirutils import LEFT, RIGHT, SAME, DIFF
 from .manifest import Manifest, ManifestChange
 from .jardiff import JarChange, JarReport, add_jardiff_optgroup
@@ -72,6 +72,13 @@ TEXT_PATTERNS = (
     "*.xml", )
 
 
+# the compiled patterns for the entry kinds of DistChange.collect_impl
+_JAR_FILES = PatternSet(JAR_PATTERNS)
+_CLASS_FILES = PatternSet(("*.class", ))
+_TEXT_FILES = PatternSet(TEXT_PATTERNS)
+_MANIFEST_FILES = PatternSet(("*/MANIFEST.MF", ))
+
+
 class DistContentChange(SuperChange):
 
     label = "Distributed Content"
@@ -312,7 +319,7 @@ class DistChange(SuperChange):
         deep = not self.shallow
 
         for event, entry in compare(ld, rd):
-            if deep and fnmatches(entry, *JAR_PATTERNS):
+            if deep and _JAR_FILES.matches(entry):
                 if event == LEFT:
                     yield DistJarRemoved(ld, rd, entry)
                 elif event == RIGHT:
@@ -322,7 +329,7 @@ class DistChange(SuperChange):
                 elif event == SAME:
                     yield DistJarChange(ld, rd, entry, False)
 
-            elif deep and fnmatches(entry, "*.class"):
+            elif deep and _CLASS_FILES.matches(entry):
                 if event == LEFT:
                     yield DistClassRemoved(ld, rd, entry)
                 elif event == RIGHT:
@@ -332,7 +339,7 @@ class DistChange(SuperChange):
                 elif event == SAME:
                     yield DistClassChange(ld, rd, entry, False)
 
-            elif deep and fnmatches(entry, *TEXT_PATTERNS):
+            elif deep and _TEXT_FILES.matches(entry):
                 if event == LEFT:
                     yield DistContentRemoved(ld, rd, entry)
                 elif event == RIGHT:
@@ -342,7 +349,7 @@ class DistChange(SuperChange):
                 elif event == SAME:
                     yield DistTextChange(ld, rd, entry, False)
 
-            elif deep and fnmatches(entry, "*/MANIFEST.MF"):
+            elif deep and _MANIFEST_FILES.matches(entry):
                 if event == LEFT:
                     yield DistContentRemoved(ld, rd, entry)
                 elif event == RIGHT:
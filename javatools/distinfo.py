@@ -34,9 +34,12 @@ from os.path import isdir, join
 from shutil import rmtree
 from tempfile import mkdtemp
 
-from . import unpack_classfile
+from . import unpack_class, unpack_classfile, PROFILE_FULL, PROFILE_NO_CODE
+from . import SymbolTable
+from .cache import ClassCache, digest_key, summary_symbols
 from .jarinfo import JarInfo, JAR_PATTERNS, REQ_BY_CLASS, PROV_BY_CLASS
-from .dirutils import fnmatches
+from .dirutils import PatternSet
+from .opstats import dist_opcode_stats
 from .ziputils import open_zip
 
 
@@ -47,12 +50,20 @@ REQ_BY_JAR = "jar.requires"
 PROV_BY_JAR = "jar.provides"
 
 
+_JAR_FILES = PatternSet(JAR_PATTERNS)
+_CLASS_FILES = PatternSet(("*.class", ))
+
+
 class DistInfo(object):
 
 
-    def __init__(self, base_path):
+    def __init__(self, base_path, cache=None):
         self.base_path = base_path
 
+        # optional ClassCache in which to look up the requires and
+        # provides of classes before unpacking them
+        self.cache = cache
+
         # a pair of strings useful for later reporting. Non-mandatory
         self.product = None
         self.version = None
@@ -60,7 +71,17 @@ class DistInfo(object):
         # if the dist is a zip, we'll explode it into tmpdir
         self.tmpdir = None
 
+        # shared by every class unpacked from this dist, in order to
+        # deduplicate their strings
+        self.interns = {}
+
+        # shared by every jar in this dist, so that their requires and
+        # provides are gathered as comparable ids
+        self.symbols = SymbolTable()
+
         self._contents = None
+        self._requires_ids = None
+        self._provides_ids = None
         self._requires = None
         self._provides = None
 
@@ -84,6 +105,7 @@ class DistInfo(object):
 
 
     def _collect_requires_provides(self):
+        intern = self.symbols.intern
         req = {}
         prov = {}
 
@@ -91,26 +113,72 @@ class DistInfo(object):
 
         for entry in self.get_jars():
             ji = self.get_jarinfo(entry)
-            for sym, data in ji.get_requires().items():
+            for sym, data in ji.get_requires_ids().items():
                 req.setdefault(sym, []).append((REQ_BY_JAR, entry, data))
-            for sym, data in ji.get_provides().items():
+            for sym, data in ji.get_provides_ids().items():
                 prov.setdefault(sym, []).append((PROV_BY_JAR, entry, data))
                 p.add(sym)
             ji.close()
 
         for entry in self.get_classes():
-            ci = self.get_classinfo(entry)
-            for sym in ci.get_requires():
-                req.setdefault(sym, []).append((REQ_BY_CLASS, entry))
-            for sym in ci.get_provides(private=False):
-                prov.setdefault(sym, []).append((PROV_BY_CLASS, entry))
-            for sym in ci.get_provides(private=True):
-                p.add(sym)
+            requires, provides, private = self._class_requires_provides(entry)
+            for sym in requires:
+                req.setdefault(intern(sym), []).append((REQ_BY_CLASS, entry))
+            for sym in provides:
+                prov.setdefault(intern(sym), []).append((PROV_BY_CLASS, entry))
+            for sym in private:
+                p.add(intern(sym))
 
         req = dict((k, v) for k, v in req.items() if k not in p)
 
-        self._requires = req
-        self._provides = prov
+        self._requires_ids = req
+        self._provides_ids = prov
+
+
+    def _class_requires_provides(self, entry):
+        """ tuple of the requires, the provides, and the private
+        provides of a class entry, as symbols """
+
+        if self.cache is not None:
+            summary = self.get_class_summary(entry)
+            return summary_symbols(summary)
+
+        # the requires and provides only need the constant pool and
+        # the members, including the private ones
+        ci = self.get_classinfo(entry, PROFILE_NO_CODE)
+        return (ci.get_requires_symbols(),
+                ci.get_provides_symbols(private=False),
+                ci.get_provides_symbols(private=True))
+
+
+    def get_class_summary(self, entry):
+        """ the cache summary of a class entry (see
+        cache.class_summary), keyed by the digest of the class
+        file. Requires that this DistInfo was given a cache. """
+
+        with open(join(self.base_path, entry), "rb") as fd:
+            data = fd.read()
+        return self.cache.get_summary(
+            digest_key(data),
+            lambda: unpack_class(data, interns=self.interns))
+
+
+    def get_requires_ids(self):
+        """ a map of the ids in symbols of the requirements to what
+        requires them """
+
+        if self._requires_ids is None:
+            self._collect_requires_provides()
+        return self._requires_ids
+
+
+    def get_provides_ids(self):
+        """ a map of the ids in symbols of the provides to what
+        provides them """
+
+        if self._provides_ids is None:
+            self._collect_requires_provides()
+        return self._provides_ids
 
 
     def get_requires(self, ignored=tuple()):
@@ -119,12 +187,12 @@ class DistInfo(object):
         classes, etc that shouldn't be included in the provides map"""
 
         if self._requires is None:
-            self._collect_requires_provides()
+            self._requires = self.symbols.render(self.get_requires_ids())
 
         d = self._requires
         if ignored:
-            d = dict((k, v) for k, v in d.items()
-                     if not fnmatches(k, *ignored))
+            matches = PatternSet(ignored).matches
+            d = dict((k, v) for k, v in d.items() if not matches(k))
         return d
 
 
@@ -135,12 +203,12 @@ class DistInfo(object):
         in the provides map"""
 
         if self._provides is None:
-            self._collect_requires_provides()
+            self._provides = self.symbols.render(self.get_provides_ids())
 
         d = self._provides
         if ignored:
-            d = dict((k, v) for k, v in d.items()
-                     if not fnmatches(k, *ignored))
+            matches = PatternSet(ignored).matches
+            d = dict((k, v) for k, v in d.items() if not matches(k))
         return d
 
 
@@ -148,12 +216,13 @@ class DistInfo(object):
         """ sequence of entry names found in this distribution """
 
         for entry in self.get_contents():
-            if fnmatches(entry, *JAR_PATTERNS):
+            if _JAR_FILES.matches(entry):
                 yield entry
 
 
     def get_jarinfo(self, entry):
-        return JarInfo(join(self.base_path, entry))
+        return JarInfo(join(self.base_path, entry), interns=self.interns,
+                       cache=self.cache, symbols=self.symbols)
 
 
     def get_classes(self):
@@ -162,12 +231,13 @@ class DistInfo(object):
         does not include classes within JARs that are inthe dist."""
 
         for entry in self.get_contents():
-            if fnmatches(entry, "*.class"):
+            if _CLASS_FILES.matches(entry):
                 yield entry
 
 
-    def get_classinfo(self, entry):
-        return unpack_classfile(join(self.base_path, entry))
+    def get_classinfo(self, entry, profile=PROFILE_FULL):
+        return unpack_classfile(join(self.base_path, entry),
+                                interns=self.interns, profile=profile)
 
 
     def get_contents(self):
@@ -224,6 +294,10 @@ def cli_distinfo(options, info):
     if options.dist_requires:
         cli_dist_requires(options, info)
 
+    if options.opcode_stats:
+        dump(dist_opcode_stats(info), sys.stdout, sort_keys=True, indent=2)
+        print()
+
     # TODO: simple things like listing JARs and non-JAR files
 
 
@@ -236,6 +310,9 @@ def cli_distinfo_json(options, info):
     if options.dist_requires:
         data["dist.requires"] = info.get_requires(options.api_ignore)
 
+    if options.opcode_stats:
+        data["dist.opcode_stats"] = dist_opcode_stats(info)
+
     dump(data, sys.stdout, sort_keys=True, indent=2)
 
 
@@ -244,7 +321,8 @@ def cli(options):
     # parser unused
 
     pathn = options.dist
-    info = DistInfo(pathn)
+    cache = options.cache_dir and ClassCache(options.cache_dir)
+    info = DistInfo(pathn, cache=cache)
 
     if options.json:
         cli_distinfo_json(options, info)
@@ -31,7 +31,7 @@ from . import unpack_class
 from .change import GenericChange, SuperChange, Addition, Removal
 from .change import squash, yield_sorted_by_type
 from .classdiff import JavaClassChange, JavaClassReport
-from .dirutils import fnmatches
+from .dirutils import PatternSet, fnmatches
 from .manifest import Manifest, ManifestChange
 from .manifest import SignatureManifestChange, SignatureBlockFileChange
 from .manifest import file_matches_sigfile, file_matches_sigblock
@@ -55,6 +55,9 @@ __all__ = (
     "add_jardiff_optgroup", "default_jardiff_options", )
 
 
+_CLASS_FILES = PatternSet(("*.class", ))
+
+
 class JarTypeChange(GenericChange):
     """
     exploded vs. zipped and compression level
@@ -345,7 +348,7 @@ class JarContentsChange(SuperChange):
                     yield JarSignatureBlockFileChange(left, right,
                                                       entry, False)
 
-                elif fnmatches(entry, "*.class"):
+                elif _CLASS_FILES.matches(entry):
                     yield JarClassChange(left, right, entry, False)
 
                 else:
@@ -361,7 +364,7 @@ class JarContentsChange(SuperChange):
                 elif file_matches_sigblock(entry):
                     yield JarSignatureBlockFileChange(left, right, entry)
 
-                elif fnmatches(entry, "*.class"):
+                elif _CLASS_FILES.matches(entry):
                     yield JarClassChange(left, right, entry)
 
                 else:
@@ -374,7 +377,7 @@ class JarContentsChange(SuperChange):
                 elif file_matches_sigblock(entry):
                     yield JarSignatureBlockFileRemoved(left, right, entry)
 
-                elif fnmatches(entry, "*.class"):
+                elif _CLASS_FILES.matches(entry):
                     yield JarClassRemoved(left, right, entry)
 
                 else:
@@ -387,7 +390,7 @@ class JarContentsChange(SuperChange):
                 elif file_matches_sigblock(entry):
                     yield JarSignatureBlockFileAdded(left, right, entry)
 
-                elif fnmatches(entry, "*.class"):
+                elif _CLASS_FILES.matches(entry):
                     yield JarClassAdded(left, right, entry)
 
                 else:
@@ -30,9 +30,12 @@ import sys
 from argparse import ArgumentParser
 from json import dump
 
-from . import unpack_class
+from . import unpack_class, unpack_class_header
+from . import PROFILE_FULL, PROFILE_NO_CODE, SymbolTable
+from .cache import ClassCache, summary_symbols, zip_info_key
 from .classinfo import cli_print_classinfo, add_classinfo_optgroup
-from .dirutils import fnmatches
+from .dirutils import PatternSet
+from .opstats import jar_opcode_stats
 from .ziputils import open_zip_entry, zip_file, zip_entry_rollup
 
 
@@ -56,19 +59,40 @@ JAR_PATTERNS = (
 )
 
 
+_CLASS_FILES = PatternSet(("*.class", ))
+
+
 REQ_BY_CLASS = "class.requires"
 PROV_BY_CLASS = "class.provides"
 
 
 class JarInfo(object):
+    """
+    Information about the classes in a jar. The strings of every class
+    unpacked through the same JarInfo are deduplicated via its interns
+    dict, which may also be passed in to share it more widely.
+
+    If a ClassCache is given, the requires and provides of each class
+    are looked up in it before the class is unpacked.
 
-    def __init__(self, filename=None, zipfile=None):
+    The requires and provides are gathered as ids in a SymbolTable,
+    which may also be passed in to share the ids more widely, and are
+    only rendered to strings by get_requires and get_provides.
+    """
+
+    def __init__(self, filename=None, zipfile=None, interns=None,
+                 cache=None, symbols=None):
         if not (filename or zipfile):
             raise TypeError("one of pathname or zipinfo must be specified")
 
         self.filename = filename
         self.zipfile = zipfile
+        self.interns = {} if interns is None else interns
+        self.cache = cache
+        self.symbols = SymbolTable() if symbols is None else symbols
 
+        self._requires_ids = None
+        self._provides_ids = None
         self._requires = None
         self._provides = None
 
@@ -91,6 +115,7 @@ class JarInfo(object):
 
 
     def _collect_requires_provides(self):
+        intern = self.symbols.intern
         req = {}
         prov = {}
 
@@ -101,39 +126,92 @@ class JarInfo(object):
         p = set()
 
         for entry in self.get_classes():
-            ci = self.get_classinfo(entry)
-            for sym in ci.get_requires():
-                req.setdefault(sym, list()).append((REQ_BY_CLASS, entry))
-            for sym in ci.get_provides(private=False):
-                prov.setdefault(sym, list()).append((PROV_BY_CLASS, entry))
-            for sym in ci.get_provides(private=True):
-                p.add(sym)
+            requires, provides, private = self._class_requires_provides(entry)
+            for sym in requires:
+                req.setdefault(intern(sym), list()).append(
+                    (REQ_BY_CLASS, entry))
+            for sym in provides:
+                prov.setdefault(intern(sym), list()).append(
+                    (PROV_BY_CLASS, entry))
+            for sym in private:
+                p.add(intern(sym))
 
         req = dict((k, v) for k, v in req.items() if k not in p)
 
-        self._requires = req
-        self._provides = prov
+        self._requires_ids = req
+        self._provides_ids = prov
+
+
+    def _class_requires_provides(self, entry):
+        """
+        tuple of the requires, the provides, and the private provides of
+        a class entry, as symbols
+        """
+
+        if self.cache is not None:
+            summary = self.get_class_summary(entry)
+            return summary_symbols(summary)
+
+        # the requires and provides only need the constant pool and
+        # the members, including the private ones
+        ci = self.get_classinfo(entry, PROFILE_NO_CODE)
+        return (ci.get_requires_symbols(),
+                ci.get_provides_symbols(private=False),
+                ci.get_provides_symbols(private=True))
+
+
+    def get_class_summary(self, entry):
+        """
+        the cache summary of a class entry (see cache.class_summary),
+        keyed by the entry's CRC and size. Requires that this JarInfo
+        was given a cache.
+        """
+
+        key = zip_info_key(self.get_zipfile().getinfo(entry))
+        return self.cache.get_summary(key, lambda: self.get_classinfo(entry))
+
+
+    def get_requires_ids(self):
+        """
+        a map of the ids in symbols of the requirements to what
+        requires them
+        """
+
+        if self._requires_ids is None:
+            self._collect_requires_provides()
+        return self._requires_ids
+
+
+    def get_provides_ids(self):
+        """
+        a map of the ids in symbols of the provides to what provides
+        them
+        """
+
+        if self._provides_ids is None:
+            self._collect_requires_provides()
+        return self._provides_ids
 
 
     def get_requires(self, ignored=tuple()):
         if self._requires is None:
-            self._collect_requires_provides()
+            self._requires = self.symbols.render(self.get_requires_ids())
 
         d = self._requires
         if ignored:
-            d = dict((k, v) for k, v in d.items()
-                     if not fnmatches(k, *ignored))
+            matches = PatternSet(ignored).matches
+            d = dict((k, v) for k, v in d.items() if not matches(k))
         return d
 
 
     def get_provides(self, ignored=tuple()):
         if self._provides is None:
-            self._collect_requires_provides()
+            self._provides = self.symbols.render(self.get_provides_ids())
 
         d = self._provides
         if ignored:
-            d = dict((k, v) for k, v in d.items()
-                     if not fnmatches(k, *ignored))
+            matches = PatternSet(ignored).matches
+            d = dict((k, v) for k, v in d.items() if not matches(k))
         return d
 
 
@@ -143,17 +221,30 @@ class JarInfo(object):
         """
 
         for n in self.get_zipfile().namelist():
-            if fnmatches(n, "*.class"):
+            if _CLASS_FILES.matches(n):
                 yield n
 
 
-    def get_classinfo(self, entry):
+    def get_classinfo(self, entry, profile=PROFILE_FULL):
         """
-        fetch a class entry as a JavaClassInfo instance
+        fetch a class entry as a JavaClassInfo instance, unpacked with
+        the given profile
         """
 
         with self.open(entry) as cfd:
-            return unpack_class(cfd)
+            return unpack_class(cfd, interns=self.interns, profile=profile)
+
+
+    def iter_class_headers(self):
+        """
+        sequence of (entry, JavaClassHeader) pairs for the .class files
+        in the underlying zip. Only the headers of the classes are
+        unpacked.
+        """
+
+        for entry in self.get_classes():
+            with self.open(entry) as cfd:
+                yield entry, unpack_class_header(cfd)
 
 
     def get_zipfile(self):
@@ -212,18 +303,21 @@ def cli_jar_classes(options, jarinfo):
 def cli_jar_provides(options, jarinfo):
     print("jar provides:")
 
-    for provided in sorted(jarinfo.get_provides().keys()):
-        if not fnmatches(provided, *options.api_ignore):
-            print(" ", provided)
+    for provided in sorted(jarinfo.get_provides(options.api_ignore)):
+        print(" ", provided)
     print()
 
 
 def cli_jar_requires(options, jarinfo):
     print("jar requires:")
 
-    for required in sorted(jarinfo.get_requires().keys()):
-        if not fnmatches(required, *options.api_ignore):
-            print(" ", required)
+    for required in sorted(jarinfo.get_requires(options.api_ignore)):
+        print(" ", required)
+    print()
+
+
+def cli_jar_opcode_stats(options, jarinfo):
+    dump(jar_opcode_stats(jarinfo), sys.stdout, sort_keys=True, indent=2)
     print()
 
 
@@ -243,6 +337,9 @@ def cli_jarinfo(options, info):
     if options.jar_classes:
         cli_jar_classes(options, info)
 
+    if options.opcode_stats:
+        cli_jar_opcode_stats(options, info)
+
 
 def cli_jarinfo_json(options, info):
     data = {}
@@ -253,6 +350,9 @@ def cli_jarinfo_json(options, info):
     if options.jar_requires:
         data["jar.requires"] = info.get_requires(options.api_ignore)
 
+    if options.opcode_stats:
+        data["jar.opcode_stats"] = jar_opcode_stats(info)
+
     if options.zip:
         zipfile = info.get_zipfile()
         filec, dirc, totalc, totalu = zip_entry_rollup(zipfile)
@@ -281,8 +381,10 @@ def cli(options):
                          options.disassemble or
                          options.sigs)
 
+    cache = options.cache_dir and ClassCache(options.cache_dir)
+
     for fn in options.jarfiles:
-        with JarInfo(filename=fn) as ji:
+        with JarInfo(filename=fn, cache=cache) as ji:
             if options.json:
                 cli_jarinfo_json(options, ji)
             else:
@@ -311,6 +413,16 @@ def add_jarinfo_optgroup(parser):
                    action="store_true", default=False,
                    help="API requires information at the JAR level")
 
+    g.add_argument("--opcode-stats", dest="opcode_stats",
+                   action="store_true", default=False,
+                   help="JSON histograms of the opcodes of each class"
+                   " and of the whole")
+
+    g.add_argument("--cache-dir", dest="cache_dir",
+                   action="store", default=None,
+                   help="directory in which to cache the requires and"
+                   " provides of classes between runs")
+
 
 def create_optparser(progname):
     parser = ArgumentParser(progname)
@@ -34,10 +34,9 @@ import sys
 
 from base64 import b64encode
 from collections import OrderedDict
+from io import BytesIO
 from os.path import isdir, join, sep, split
 from os import walk
-from six import BytesIO
-from six.moves import zip
 from zipfile import ZipFile
 
 from .change import GenericChange, SuperChange
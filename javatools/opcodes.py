@@ -26,8 +26,11 @@ References
 """
 
 
+from array import array
+from bisect import bisect_left, bisect_right
 from functools import partial
-from six.moves import range
+from hashlib import sha256
+from itertools import compress
 
 from .pack import compile_struct
 
@@ -35,7 +38,9 @@ from .pack import compile_struct
 __all__ = (
     "get_opcode_by_name", "get_opname_by_code",
     "get_arg_format", "has_const_arg",
-    "disassemble",
+    "disassemble", "disassemble_arrays", "Disassembly",
+    "build_cfg", "ControlFlowGraph",
+    "EDGE_FALLTHROUGH", "EDGE_BRANCH", "EDGE_EXCEPTION",
     "OP_aaload", "OP_aastore", "OP_aconst_null", "OP_aload", "OP_aload_0",
     "OP_aload_1", "OP_aload_2", "OP_aload_3", "OP_anewarray", "OP_areturn",
     "OP_arraylength", "OP_astore", "OP_astore_0", "OP_astore_1",
@@ -93,6 +98,36 @@ _OPINDEX_PRODUCE = 4
 _OPINDEX_CONST = 5
 
 
+# the tables, indexed by opcode, which the disassembler uses in place
+# of the __OPTABLE. _OP_LENGTHS has the length of each instruction
+# including its arguments, or 0 if that varies or the opcode is
+# unknown. _ARG_UNPACKERS has the unpack_from of the struct of the
+# arguments of fixed-length instructions, and the unpacking function
+# of variable-length instructions.
+_OP_LENGTHS = [0] * 256
+_ARG_UNPACKERS = [None] * 256
+
+# 1 for each opcode whose first argument is a constant pool index, for
+# use with bytes.translate
+_CONST_MASK = bytearray(256)
+
+# how each opcode affects the flow of control, filled in once the
+# opcodes are defined. Most just fall through to the next instruction.
+_FLOW_NONE = 0
+_FLOW_BRANCH = 1    # conditional jump to a relative offset
+_FLOW_GOTO = 2      # unconditional jump to a relative offset
+_FLOW_JSR = 3       # subroutine call, returns to the next instruction
+_FLOW_SWITCH = 4    # jump to one of several relative offsets
+_FLOW_END = 5       # return, throw, or return from a subroutine
+_FLOW_WIDE = 6      # wide, which is an end only when it widens a ret
+_FLOW_KINDS = bytearray(256)
+
+# the kinds of the edges of a ControlFlowGraph
+EDGE_FALLTHROUGH = 0
+EDGE_BRANCH = 1
+EDGE_EXCEPTION = 2
+
+
 # commonly re-occurring struct formats
 # pylint: disable=C0103
 _struct_i = compile_struct(">i")
@@ -100,6 +135,7 @@ _struct_ii = compile_struct(">ii")
 _struct_iii = compile_struct(">iii")
 _struct_BH = compile_struct(">BH")
 _struct_BHh = compile_struct(">BHh")
+_struct_Q = compile_struct(">Q")
 
 
 def __op(name, val, fmt=None, const=False, consume=0, produce=0):
@@ -114,7 +150,19 @@ def __op(name, val, fmt=None, const=False, consume=0, produce=0):
     # callable to do more complex unpacking. If it's a str, create a
     # callable for it.
     if isinstance(fmt, str):
-        fmt = partial(_unpack, compile_struct(fmt))
+        struct = compile_struct(fmt)
+        fmt = partial(_unpack, struct)
+        _OP_LENGTHS[val] = struct.size + 1
+        _ARG_UNPACKERS[val] = struct.unpack_from
+
+    elif fmt:
+        _ARG_UNPACKERS[val] = fmt
+
+    else:
+        _OP_LENGTHS[val] = 1
+
+    if const:
+        _CONST_MASK[val] = 1
 
     operand = (name, val, fmt, consume, produce, const)
 
@@ -200,7 +248,7 @@ def _unpack_tableswitch(bc, offset):
 
     joffs = list()
     for _index in range((high - low) + 1):
-        j, offset = _unpack(_struct_i, bc, offset)
+        (j, ), offset = _unpack(_struct_i, bc, offset)
         joffs.append(j)
 
     return (default, low, high, joffs), offset
@@ -211,7 +259,9 @@ def _unpack_wide(bc, offset):
     unpacker for wide ops
     """
 
-    code = ord(bc[offset])
+    code = bc[offset]
+    if not isinstance(code, int):   # Py2
+        code = ord(code)
 
     if code == OP_iinc:
         return _unpack(_struct_BHh, bc, offset)
@@ -228,31 +278,400 @@ def _unpack_wide(bc, offset):
         assert False
 
 
-def disassemble(bytecode):
+class Disassembly(object):
     """
-    Generator. Disassembles Java bytecode into a sequence of (offset,
-    code, args) tuples
+    Disassembled Java bytecode, as parallel columns rather than an
+    object per instruction. offsets is an array of the offset of each
+    instruction, and opcodes is a bytes of the opcode of each
+    instruction. args is a dict of the arguments of the instructions
+    which have any, by offset, and is only unpacked when first needed.
+
+    As a sequence, a Disassembly is of (offset, code, args) tuples as
+    produced by disassemble.
+    """
+
+    __slots__ = ("offsets", "opcodes", "_code", "_args")
+
+
+    def __init__(self, offsets, opcodes, code):
+        self.offsets = offsets
+        self.opcodes = opcodes
+        self._code = code
+        self._args = None
+
+
+    @property
+    def args(self):
+        args = self._args
+        if args is None:
+            args = _unpack_args(self._code, self.offsets, self.opcodes)
+            self._args = args
+        return args
+
+
+    def get_const_offsets(self):
+        """
+        list of the offsets of the instructions whose first argument is
+        a constant pool index
+        """
+
+        mask = self.opcodes.translate(_CONST_MASK)
+        return list(compress(self.offsets, mask))
+
+
+    def __len__(self):
+        return len(self.offsets)
+
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return tuple(self)[index]
+
+        offset = self.offsets[index]
+        return (offset, self.opcodes[index], self.args.get(offset, ()))
+
+
+    def __iter__(self):
+        args = self.args
+        for offset, code in zip(self.offsets, self.opcodes):
+            yield (offset, code, args.get(offset, ()))
+
+
+    def __eq__(self, other):
+        if isinstance(other, Disassembly):
+            mine = (self.offsets, self.opcodes, self.args)
+            return mine == (other.offsets, other.opcodes, other.args)
+        return tuple(self) == other
+
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+
+    def __hash__(self):
+        # the same hash as the tuple which this compares equal to
+        return hash(tuple(self))
+
+
+    def __repr__(self):
+        return "Disassembly(%r)" % (tuple(self), )
+
+
+def _unpack_args(bytecode, offsets, opcodes):
+    """
+    dict of the arguments of the instructions at offsets, by offset,
+    omitting the instructions without any
+    """
+
+    args = {}
+    lengths = _OP_LENGTHS
+    unpackers = _ARG_UNPACKERS
+
+    for offset, code in zip(offsets, opcodes):
+        length = lengths[code]
+        if length > 1:
+            args[offset] = unpackers[code](bytecode, offset + 1)
+        elif not length:
+            args[offset] = unpackers[code](bytecode, offset + 1)[0]
+
+    return args
+
+
+def disassemble_arrays(bytecode):
+    """
+    Disassembles Java bytecode into a Disassembly. Only the offsets
+    and opcodes are found here, the arguments are unpacked later if
+    they are asked for.
     :type bytecode: bytes
     """
 
+    if isinstance(bytecode, str):   # Py2
+        bytecode = bytearray(bytecode)
+
+    offsets = array("i")
+    add_offset = offsets.append
+    lengths = _OP_LENGTHS
+
     offset = 0
     end = len(bytecode)
 
     while offset < end:
-        orig_offset = offset
+        add_offset(offset)
+
+        length = lengths[bytecode[offset]]
+        if length:
+            offset += length
+            continue
+
+        # the length of this instruction depends on its arguments
+        unpacker = _ARG_UNPACKERS[bytecode[offset]]
+        if unpacker is None:
+            raise KeyError(bytecode[offset])
+        offset = unpacker(bytecode, offset + 1)[1]
+
+    opcodes = bytes(bytearray(map(bytecode.__getitem__, offsets)))
+    return Disassembly(offsets, opcodes, bytecode)
+
+
+def disassemble(bytecode):
+    """
+    Disassembles Java bytecode into a sequence of (offset, code, args)
+    tuples
+    :type bytecode: bytes
+    """
+
+    return iter(disassemble_arrays(bytecode))
+
+
+class ControlFlowGraph(object):
+    """
+    The basic blocks of a Disassembly and the edges between them.
+
+    starts is an array of the code offset of each block, and indexes
+    is an array of the index of the first instruction of each block in
+    the disassembly, with the instruction count appended. The edges
+    are the parallel arrays edge_from, edge_to and edge_kinds, the
+    last holding one of EDGE_FALLTHROUGH, EDGE_BRANCH or
+    EDGE_EXCEPTION for each.
+    """
+
+    __slots__ = ("disassembly", "starts", "indexes",
+                 "edge_from", "edge_to", "edge_kinds",
+                 "_deref_const", "_hashes")
+
+
+    def __init__(self, disassembly, deref_const=None):
+        self.disassembly = disassembly
+        self.starts = array("i")
+        self.indexes = array("i")
+        self.edge_from = array("i")
+        self.edge_to = array("i")
+        self.edge_kinds = bytearray()
+
+        self._deref_const = deref_const
+        self._hashes = None
+
+
+    def __len__(self):
+        return len(self.starts)
+
+
+    def get_block_for_offset(self, code_offset):
+        """
+        the index of the block containing the given code offset
+        """
+
+        return bisect_right(self.starts, code_offset) - 1
+
+
+    def get_block(self, block):
+        """
+        tuple of the (offset, code, args) instructions of a block
+        """
+
+        dis = self.disassembly
+        first, end = self.indexes[block], self.indexes[block + 1]
+        return tuple(dis[index] for index in range(first, end))
+
+
+    def get_successors(self, block):
+        """
+        list of (block, edge_kind) pairs for the edges leaving a block
+        """
+
+        edges = zip(self.edge_from, self.edge_to, self.edge_kinds)
+        return [(t, k) for f, t, k in edges if f == block]
+
+
+    def get_predecessors(self, block):
+        """
+        list of (block, edge_kind) pairs for the edges entering a block
+        """
+
+        edges = zip(self.edge_from, self.edge_to, self.edge_kinds)
+        return [(f, k) for f, t, k in edges if t == block]
+
+
+    def get_block_hashes(self):
+        """
+        an array of a 64-bit hash of each block. The hash covers the
+        opcodes and arguments of the block, except for branch offsets,
+        which would otherwise change with any code elsewhere in the
+        method. If the graph was built with a deref_const function,
+        constants are hashed by value rather than by index.
+        """
 
-        code = bytecode[offset]
-        if not isinstance(code, int):   # Py3
-            code = ord(code)
+        hashes = self._hashes
+        if hashes is not None:
+            return hashes
 
-        offset += 1
+        dis = self.disassembly
+        offsets = dis.offsets
+        opcodes = dis.opcodes
+        args = dis.args
+        indexes = self.indexes
+        deref_const = self._deref_const
+        flows = _FLOW_KINDS
 
-        args = tuple()
-        fmt = get_arg_format(code)
-        if fmt:
-            args, offset = fmt(bytecode, offset)
+        hashes = array("Q")
+        for block in range(len(self.starts)):
+            first, end = indexes[block], indexes[block + 1]
 
-        yield (orig_offset, code, args)
+            values = list()
+            for index in range(first, end):
+                arg = args.get(offsets[index])
+                if arg is None:
+                    continue
+
+                code = opcodes[index]
+                flow = flows[code]
+                if flow in (_FLOW_BRANCH, _FLOW_GOTO, _FLOW_JSR):
+                    continue
+                elif flow == _FLOW_SWITCH:
+                    # keep the keys, drop the jumps
+                    if code == OP_tableswitch:
+                        arg = arg[1:3]
+                    else:
+                        arg = tuple(match for match, _jump in arg[1])
+                elif deref_const and _CONST_MASK[code]:
+                    arg = (deref_const(arg[0]), ) + tuple(arg[1:])
+
+                values.append((index - first, arg))
+
+            digest = sha256(opcodes[first:end])
+            digest.update(repr(values).encode("utf8"))
+            hashes.append(_struct_Q.unpack_from(digest.digest())[0])
+
+        self._hashes = hashes
+        return hashes
+
+
+def _instruction_flow(code, arg):
+    """
+    the flow kind of an instruction, with that of wide resolved by
+    the instruction it widens
+    """
+
+    flow = _FLOW_KINDS[code]
+    if flow == _FLOW_WIDE:
+        flow = _FLOW_END if arg[0] == OP_ret else _FLOW_NONE
+    return flow
+
+
+def _jump_offsets(code, flow, offset, arg):
+    """
+    the distinct offsets an instruction with the given flow kind may
+    jump to, not counting falling through to the next instruction
+    """
+
+    if flow in (_FLOW_NONE, _FLOW_END):
+        return ()
+
+    elif flow == _FLOW_SWITCH:
+        if code == OP_tableswitch:
+            jumps = [arg[0]]
+            jumps.extend(arg[3])
+        else:
+            jumps = [arg[0]]
+            jumps.extend(jump for _match, jump in arg[1])
+
+        found = list()
+        seen = set()
+        for jump in jumps:
+            if jump not in seen:
+                seen.add(jump)
+                found.append(offset + jump)
+        return found
+
+    else:
+        return (offset + arg[0], )
+
+
+def build_cfg(disassembly, exceptions=(), deref_const=None):
+    """
+    Builds the ControlFlowGraph of a Disassembly. exceptions is a
+    sequence of (start_pc, end_pc, handler_pc) triples from the
+    exception table of the code. deref_const, if given, is used to
+    hash constants by value in the block hashes.
+    """
+
+    cfg = ControlFlowGraph(disassembly, deref_const)
+
+    offsets = disassembly.offsets
+    opcodes = disassembly.opcodes
+    args = disassembly.args
+    count = len(offsets)
+    if not count:
+        cfg.indexes.append(0)
+        return cfg
+
+    # the leaders are the first instruction, the targets of jumps, the
+    # instructions following a jump or the end of a flow, and the
+    # boundaries and handlers of the exception table. Only the
+    # instructions which affect flow are visited.
+    leaders = set([0])
+    jumps = dict()
+
+    for index in compress(range(count), opcodes.translate(_FLOW_KINDS)):
+        offset = offsets[index]
+        code = opcodes[index]
+        arg = args.get(offset)
+        flow = _instruction_flow(code, arg)
+        if flow == _FLOW_NONE:
+            continue
+
+        found = _jump_offsets(code, flow, offset, arg)
+        jumps[index] = found
+        leaders.update(found)
+        if index + 1 < count:
+            leaders.add(offsets[index + 1])
+
+    for start_pc, end_pc, handler_pc in exceptions:
+        leaders.update((start_pc, end_pc, handler_pc))
+
+    starts = cfg.starts
+    indexes = cfg.indexes
+    for leader in sorted(leaders):
+        index = bisect_left(offsets, leader)
+        if index < count and offsets[index] == leader:
+            starts.append(leader)
+            indexes.append(index)
+    indexes.append(count)
+
+    block_at = dict((start, block) for block, start in enumerate(starts))
+    blocks = len(starts)
+
+    edge_from = cfg.edge_from
+    edge_to = cfg.edge_to
+    edge_kinds = cfg.edge_kinds
+
+    for block in range(blocks):
+        last = indexes[block + 1] - 1
+
+        flow = _instruction_flow(opcodes[last], args.get(offsets[last]))
+        if flow in (_FLOW_NONE, _FLOW_BRANCH, _FLOW_JSR) \
+           and block + 1 < blocks:
+            edge_from.append(block)
+            edge_to.append(block + 1)
+            edge_kinds.append(EDGE_FALLTHROUGH)
+
+        for target in jumps.get(last, ()):
+            if target in block_at:
+                edge_from.append(block)
+                edge_to.append(block_at[target])
+                edge_kinds.append(EDGE_BRANCH)
+
+    for start_pc, end_pc, handler_pc in exceptions:
+        handler = block_at.get(handler_pc)
+        if handler is None:
+            continue
+        for block in range(bisect_left(starts, start_pc),
+                           bisect_left(starts, end_pc)):
+            edge_from.append(block)
+            edge_to.append(handler)
+            edge_kinds.append(EDGE_EXCEPTION)
+
+    return cfg
 
 
 # And now, the OP codes themselves
@@ -481,5 +900,24 @@ OP_tableswitch = __op('tableswitch', 0xaa, fmt=_unpack_tableswitch)
 OP_wide = __op('wide', 0xc4, fmt=_unpack_wide)
 
 
+def __flow(kind, *codes):
+    for code in codes:
+        _FLOW_KINDS[code] = kind
+
+
+__flow(_FLOW_BRANCH,
+       OP_ifeq, OP_ifne, OP_iflt, OP_ifge, OP_ifgt, OP_ifle,
+       OP_if_icmpeq, OP_if_icmpne, OP_if_icmplt, OP_if_icmpge,
+       OP_if_icmpgt, OP_if_icmple, OP_if_acmpeq, OP_if_acmpne,
+       OP_ifnull, OP_ifnonnull)
+__flow(_FLOW_GOTO, OP_goto, OP_goto_w)
+__flow(_FLOW_JSR, OP_jsr, OP_jsr_w)
+__flow(_FLOW_SWITCH, OP_tableswitch, OP_lookupswitch)
+__flow(_FLOW_END,
+       OP_ireturn, OP_lreturn, OP_freturn, OP_dreturn, OP_areturn,
+       OP_return, OP_athrow, OP_ret)
+__flow(_FLOW_WIDE, OP_wide)
+
+
 #
 # The end.
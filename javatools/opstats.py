@@ -0,0 +1,175 @@
+# This library is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as
+# published by the Free Software Foundation; either version 3 of the
+# License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, see
+# <http://www.gnu.org/licenses/>.
+
+
+"""
+Opcode statistics for classes, JARs and distributions, for tracking
+the instruction profile of a code base from release to release.
+
+The histograms are counted with NumPy when it is available, and with
+a Counter when it is not.
+
+:license: LGPL
+"""
+
+
+from collections import Counter
+
+from .opcodes import disassemble_arrays, get_opname_by_code
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+__all__ = (
+    "opcode_counts", "class_opcode_stats",
+    "jar_opcode_stats", "dist_opcode_stats",
+)
+
+
+def opcode_counts(opcodes):
+    """
+    a sequence of the count of each of the 256 opcode values in the
+    given bytes of opcodes, such as Disassembly.opcodes
+    """
+
+    if numpy is not None:
+        data = numpy.frombuffer(opcodes, dtype=numpy.uint8)
+        return numpy.bincount(data, minlength=256)
+
+    counts = [0] * 256
+    for code, count in Counter(bytearray(opcodes)).items():
+        counts[code] = count
+    return counts
+
+
+def _sum_counts(histograms):
+    """
+    the sum of a sequence of opcode_counts results
+    """
+
+    if numpy is not None:
+        return sum(histograms, numpy.zeros(256, dtype=numpy.int64))
+
+    if not histograms:
+        return [0] * 256
+    return [sum(column) for column in zip(*histograms)]
+
+
+def _class_opcodes(info):
+    """
+    the opcodes of every method of a JavaClassInfo, as one bytes. Only
+    the raw bytecode of each method is taken from its Code attribute,
+    and the opcode positions come from the length table of the
+    disassembler, so no arguments are ever unpacked.
+    """
+
+    opcodes = list()
+    for method in info.methods:
+        bytecode = method.get_bytecode()
+        if bytecode is not None:
+            opcodes.append(disassemble_arrays(bytecode).opcodes)
+
+    return b"".join(opcodes)
+
+
+def _stats(counts):
+    """
+    a dict of the total instruction count and the count of each opcode
+    which appears, by name
+    """
+
+    if numpy is not None:
+        present = numpy.flatnonzero(counts).tolist()
+    else:
+        present = [code for code, count in enumerate(counts) if count]
+
+    found = dict()
+    for code in present:
+        found[get_opname_by_code(code)] = int(counts[code])
+
+    return {
+        "instructions": sum(found.values()),
+        "opcodes": found,
+    }
+
+
+def class_opcode_stats(info):
+    """
+    dict of the opcode statistics of a JavaClassInfo
+    """
+
+    return _stats(opcode_counts(_class_opcodes(info)))
+
+
+def _jar_counts(jarinfo):
+    classes = dict()
+    histograms = list()
+
+    for entry in jarinfo.get_classes():
+        counts = opcode_counts(_class_opcodes(jarinfo.get_classinfo(entry)))
+        classes[entry] = _stats(counts)
+        histograms.append(counts)
+
+    return classes, _sum_counts(histograms)
+
+
+def jar_opcode_stats(jarinfo):
+    """
+    dict of the opcode statistics of a JarInfo, with the statistics
+    of each class under "classes"
+    """
+
+    classes, total = _jar_counts(jarinfo)
+
+    stats = _stats(total)
+    stats["classes"] = classes
+    return stats
+
+
+def dist_opcode_stats(distinfo):
+    """
+    dict of the opcode statistics of a DistInfo, with the statistics
+    of each JAR under "jars" and of each loose class under "classes"
+    """
+
+    jars = dict()
+    classes = dict()
+    histograms = list()
+
+    for entry in distinfo.get_jars():
+        with distinfo.get_jarinfo(entry) as jarinfo:
+            jar_classes, counts = _jar_counts(jarinfo)
+
+        stats = _stats(counts)
+        stats["classes"] = jar_classes
+        jars[entry] = stats
+        histograms.append(counts)
+
+    for entry in distinfo.get_classes():
+        info = distinfo.get_classinfo(entry)
+        counts = opcode_counts(_class_opcodes(info))
+        classes[entry] = _stats(counts)
+        histograms.append(counts)
+
+    stats = _stats(_sum_counts(histograms))
+    stats["jars"] = jars
+    stats["classes"] = classes
+    return stats
+
+
+#
+# The end.
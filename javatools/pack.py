@@ -31,14 +31,15 @@ or stream.
 # so there will be efforts here to increase performance
 
 
+import sys
+
 from abc import ABCMeta, abstractmethod
-from six import add_metaclass
-from six.moves import range
-from struct import Struct
+from array import array
+from struct import Struct, calcsize
 
 
 __all__ = (
-    "compile_struct", "unpack",
+    "compile_struct", "unpack", "struct_columns",
     "Unpacker", "UnpackException",
     "StreamUnpacker", "BufferUnpacker",
 )
@@ -51,6 +52,14 @@ except NameError:
 # pylint: disable=C0103
 _struct_cache = dict()
 
+# the size of the chunks which a StreamUnpacker reads from its stream
+BUFFER_SIZE = 16 * 1024
+
+# the struct format characters which have an array typecode of the
+# same standard size, and so can be decoded straight into an array
+_ARRAY_TYPECODES = frozenset(c for c in "bBhHiIlLqQfd"
+                             if array(c).itemsize == calcsize(">" + c))
+
 
 def compile_struct(fmt, cache=None):
     """
@@ -69,8 +78,7 @@ def compile_struct(fmt, cache=None):
     return sfmt
 
 
-@add_metaclass(ABCMeta)
-class Unpacker(object):
+class Unpacker(object, metaclass=ABCMeta):
     """
     Abstract base class for `StreamUnpacker` and `BufferUnpacker`. Use
     the `unpack` function to obtain the correct unpacker instance for
@@ -120,6 +128,16 @@ class Unpacker(object):
         pass
 
 
+    def skip(self, count):
+        """
+        advance past count bytes of the underlying data without
+        returning them. Raises an UnpackException if there is not
+        enough data in the underlying stream.
+        """
+
+        self.read(count)
+
+
     @abstractmethod
     def close(self):  # pragma: no cover
         """
@@ -153,6 +171,28 @@ class Unpacker(object):
             yield self.unpack_struct(struct)
 
 
+    def unpack_struct_table(self, struct):
+        """
+        reads a count from the unpacker, and unpacks the precompiled
+        struct count times in a single call. Returns a tuple of the
+        unpacked data tuples
+        """
+
+        (count,) = self.unpack_struct(_H)
+        return tuple(struct.iter_unpack(self.read(count * struct.size)))
+
+
+    def unpack_struct_columns(self, struct):
+        """
+        reads a count from the unpacker, and unpacks the precompiled
+        struct count times in a single call. Returns a tuple with an
+        array of the values of each field of the struct
+        """
+
+        (count,) = self.unpack_struct(_H)
+        return struct_columns(struct, self.read(count * struct.size))
+
+
     def unpack_objects(self, atype, *params, **kwds):
         """
         reads a count from the unpacker, and instanciates that many calls
@@ -172,10 +212,20 @@ class Unpacker(object):
 class BufferUnpacker(Unpacker):
     """
     Unpacker wrapping a str or buffer.
+
+    If zero_copy is True, the data is wrapped in a memoryview and the
+    read method will return memoryview slices of it rather than
+    copies. Those slices keep the underlying data alive for as long
+    as they are referenced.
     """
 
-    def __init__(self, data, offset=0):
+    def __init__(self, data, offset=0, zero_copy=False):
         super(BufferUnpacker, self).__init__()
+
+        if zero_copy and data is not None and \
+           not isinstance(data, memoryview):
+            data = memoryview(data)
+
         self.data = data
         self.offset = offset
 
@@ -228,8 +278,9 @@ class BufferUnpacker(Unpacker):
     def read(self, count):
         """
         read count bytes from the underlying buffer and return them as a
-        str. Raises an UnpackException if there is not enough data in
-        the underlying buffer.
+        str, or as a memoryview slice if the underlying buffer is a
+        memoryview. Raises an UnpackException if there is not enough
+        data in the underlying buffer.
         """
 
         offset = self.offset
@@ -245,6 +296,25 @@ class BufferUnpacker(Unpacker):
         return self.data[offset:self.offset]
 
 
+    def skip(self, count):
+        """
+        advance past count bytes of the underlying buffer, without
+        slicing them out. Raises an UnpackException if there is not
+        enough data in the underlying buffer.
+        """
+
+        offset = self.offset
+        if self.data:
+            avail = len(self.data) - offset
+        else:
+            avail = 0
+
+        if avail < count:
+            raise UnpackException(None, count, avail)
+
+        self.offset = offset + count
+
+
     def close(self):
         """
         release the underlying buffer
@@ -259,14 +329,56 @@ class StreamUnpacker(Unpacker):
     Wraps a stream (or creates a stream for a string or buffer) and
     advances along it while unpacking structures from it.
 
+    The stream is read in chunks of buffer_size bytes into a reusable
+    internal buffer, and structures are unpacked from that buffer. As
+    such the stream will have been read past the data which has
+    actually been unpacked.
+
     This class adheres to the context management protocol, so may be
     used in conjunction with the 'with' keyword
     """
 
-    def __init__(self, data):
+    def __init__(self, data, buffer_size=BUFFER_SIZE):
         super(StreamUnpacker, self).__init__()
         self.data = data
 
+        self._buff = bytearray(buffer_size)
+        self._view = memoryview(self._buff)
+        self._pos = 0
+        self._end = 0
+
+
+    def _fill(self, size):
+        """
+        ensure that at least size bytes past the current position are
+        in the buffer, reading from the underlying stream as needed.
+        Returns the number of bytes available in the buffer, which
+        will be less than size if the stream has been exhausted.
+        """
+
+        pos = self._pos
+        avail = self._end - pos
+        if avail >= size:
+            return avail
+
+        buff = self._buff
+        if size > len(buff):
+            # a new buffer rather than a resize, as views of the old
+            # one may still be held
+            buff = bytearray(size)
+            buff[:avail] = self._view[pos:self._end]
+            self._buff = buff
+            self._view = memoryview(buff)
+
+        elif pos:
+            buff[:avail] = buff[pos:self._end]
+
+        end = _read_into(self.data, buff, self._view, avail, size)
+
+        self._pos = 0
+        self._end = end
+        return end
+
 
     def unpack(self, fmt):
         """
@@ -275,17 +387,7 @@ class StreamUnpacker(Unpacker):
         data to satisfy the fmt
         """
 
-        sfmt = compile_struct(fmt)
-        size = sfmt.size
-
-        if not self.data:
-            raise UnpackException(fmt, size, 0)
-
-        buff = self.data.read(size)
-        if len(buff) < size:
-            raise UnpackException(fmt, size, len(buff))
-
-        return sfmt.unpack(buff)
+        return self.unpack_struct(compile_struct(fmt))
 
 
     def unpack_struct(self, struct):
@@ -300,11 +402,15 @@ class StreamUnpacker(Unpacker):
         if not self.data:
             raise UnpackException(struct.format, size, 0)
 
-        buff = self.data.read(size)
-        if len(buff) < size:
-            raise UnpackException(struct.format, size, len(buff))
+        pos = self._pos
+        if self._end - pos < size:
+            avail = self._fill(size)
+            if avail < size:
+                raise UnpackException(struct.format, size, avail)
+            pos = 0
 
-        return struct.unpack(buff)
+        self._pos = pos + size
+        return struct.unpack_from(self._buff, pos)
 
 
     def read(self, count):
@@ -317,11 +423,57 @@ class StreamUnpacker(Unpacker):
         if not self.data:
             raise UnpackException(None, count, 0)
 
-        buff = self.data.read(count)
-        if len(buff) < count:
-            raise UnpackException(None, count, len(buff))
+        pos = self._pos
+        end = self._end
+
+        if end - pos >= count:
+            self._pos = pos + count
+            return bytes(self._view[pos:pos + count])
+
+        elif count <= len(self._buff):
+            avail = self._fill(count)
+            if avail < count:
+                raise UnpackException(None, count, avail)
+            self._pos = count
+            return bytes(self._view[:count])
+
+        else:
+            # too large for the buffer, so take what is buffered and
+            # read the rest from the stream into a buffer of its own
+            avail = end - pos
+            buff = bytearray(count)
+            view = memoryview(buff)
+            view[:avail] = self._view[pos:end]
+            self._pos = self._end = 0
+
+            avail = _read_into(self.data, buff, view, avail, count)
+            if avail < count:
+                raise UnpackException(None, count, avail)
+            return bytes(buff)
+
+
+    def skip(self, count):
+        """
+        advance past count bytes of the underlying stream without
+        returning them. Raises an UnpackException if there is not
+        enough data in the underlying stream.
+        """
+
+        if not self.data:
+            raise UnpackException(None, count, 0)
+
+        wanted = count
+        while True:
+            avail = self._end - self._pos
+            if avail >= count:
+                self._pos += count
+                break
 
-        return buff
+            count -= avail
+            self._pos = self._end
+
+            if not self._fill(min(count, len(self._buff))):
+                raise UnpackException(None, wanted, wanted - count)
 
 
     def close(self):
@@ -332,20 +484,97 @@ class StreamUnpacker(Unpacker):
         data = self.data
         self.data = None
 
+        self._buff = bytearray()
+        self._view = memoryview(self._buff)
+        self._pos = self._end = 0
+
         if hasattr(data, "close"):
             data.close()
 
 
-def unpack(data):
+def _read_into(stream, buff, view, start, size):
+    """
+    reads from stream into the bytearray buff, of which view is a
+    memoryview, from the offset start until at least size bytes of it
+    are filled or the stream is exhausted. Uses the stream's readinto
+    method if it has one. Returns the number of bytes of buff filled.
+    """
+
+    readinto = getattr(stream, "readinto", None)
+
+    end = start
+    while end < size:
+        if readinto is not None:
+            count = readinto(view[end:])
+        else:
+            chunk = stream.read(len(buff) - end)
+            count = len(chunk)
+            buff[end:end + count] = chunk
+
+        if not count:
+            break
+        end += count
+
+    return end
+
+
+def struct_columns(struct, data):
+    """
+    unpacks data as a sequence of the precompiled struct, whose format
+    must be a byte order followed by one character per field. Returns
+    a tuple with an array (or a tuple, for fields with no matching
+    array type) of the values of each field of the struct. Structs of
+    a single big-endian field type are decoded into one array and then
+    split, rather than row by row.
+    """
+
+    fmt = struct.format
+    if not isinstance(fmt, str):
+        fmt = fmt.decode("ascii")
+
+    order, fields = fmt[0], fmt[1:]
+    width = len(fields)
+
+    if order in ">!" and fields == fields[0] * width and \
+       fields[0] in _ARRAY_TYPECODES:
+
+        values = array(fields[0])
+        values.frombytes(data)
+        if sys.byteorder == "little":
+            values.byteswap()
+
+        if width == 1:
+            return (values,)
+        else:
+            return tuple(values[i::width] for i in range(width))
+
+    else:
+        rows = tuple(struct.iter_unpack(data))
+        return tuple(_column(c, [row[i] for row in rows])
+                     for i, c in enumerate(fields))
+
+
+def _column(typecode, values):
+    if typecode in _ARRAY_TYPECODES:
+        return array(typecode, values)
+    else:
+        return tuple(values)
+
+
+def unpack(data, zero_copy=False):
     """
     returns either a BufferUnpacker or StreamUnpacker instance,
     depending upon the type of data. The unpacker supports the managed
     context interface, so may be used eg: `with unpack(my_data) as
     unpacker:`
+
+    If zero_copy is True and data is a buffer, the BufferUnpacker
+    will return memoryview slices of data from its read method rather
+    than copying them out.
     """
 
     if isinstance(data, (bytes, buffer)):
-        return BufferUnpacker(data)
+        return BufferUnpacker(data, zero_copy=zero_copy)
 
     elif hasattr(data, "read"):
         return StreamUnpacker(data)
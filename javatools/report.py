@@ -32,8 +32,6 @@ from Cheetah.DummyTransaction import DummyTransaction
 from functools import partial
 from json import dump, JSONEncoder
 from os.path import exists, join, relpath
-from six import add_metaclass
-from six.moves import range
 
 from .dirutils import copydir, makedirsp
 
@@ -172,8 +170,7 @@ class Reporter(object):
         self._formats = None
 
 
-@add_metaclass(ABCMeta)
-class ReportFormat(object):
+class ReportFormat(object, metaclass=ABCMeta):
     """
     Base class of a report format provider. Override to describe a
     concrete format type
@@ -21,10 +21,10 @@ Utilities for discovering entry deltas in a pair of zip files.
 """
 
 
+from io import BytesIO
+from itertools import zip_longest
 from os import walk
 from os.path import getsize, isdir, isfile, islink, join, relpath
-from six import BytesIO
-from six.moves import zip_longest
 from zipfile import is_zipfile, ZipFile, ZipInfo, _EndRecData
 from zlib import crc32
 
@@ -81,27 +81,25 @@ setup(name = "javatools",
       install_requires = [
           "Cheetah3",
           "M2Crypto >= 0.26.0",
-          "six",
       ],
 
+      extras_require = {
+          # faster opcode statistics
+          "stats": ["numpy"],
+      },
+
       setup_requires = [
           "Cheetah3",
-          "six",
       ],
 
-      python_requires = (
-          ">=2.7, "
-          "!=3.0.*, !=3.1.*, !=3.2.*, !=3.3.*, !=3.4.*, "
-          "<4"
-      ),
+      python_requires = ">=3.6, <4",
 
       classifiers = [
           "Development Status :: 5 - Production/Stable",
           "Environment :: Console",
           "Intended Audience :: Developers",
           "Intended Audience :: Information Technology",
-          "Programming Language :: Python :: 2.7",
-          "Programming Language :: Python :: 3.5",
+          "Programming Language :: Python :: 3 :: Only",
           "Programming Language :: Python :: 3.6",
           # "Programming Language :: Python :: 3.7",
           "Topic :: Software Development :: Disassemblers",
@@ -21,10 +21,17 @@ license: LGPL v.3
 """
 
 
+import pickle
+import struct
+
+from array import array
+from hashlib import sha256
+from io import BytesIO
 from unittest import TestCase
 
 import javatools as jt
 import javatools.opcodes as op
+from javatools.pack import unpack
 import pkg_resources
 
 
@@ -140,6 +147,86 @@ class Sample1Tests(TestCase):
         self.assertRaises(IndexError, x)
 
 
+    def test_const_pool_lazy(self):
+        ci = load("Sample1")
+        cpool = ci.cpool
+
+        # only the entries needed to unpack the class have been decoded
+        self.assertEqual(len(cpool), 31)
+        self.assertEqual(cpool._consts[11], None)
+        self.assertEqual(cpool.get_const_type(11), jt.CONST_Utf8)
+        self.assertEqual(cpool.get_const(11), (jt.CONST_Utf8, "name"))
+        self.assertEqual(cpool._consts[11], (jt.CONST_Utf8, "name"))
+
+        # unpacking from a stream should index the same entries
+        with open(get_class_fn("Sample1"), "rb") as fd:
+            sci = jt.unpack_class(fd)
+
+        self.assertEqual(sci.cpool._tags, cpool._tags)
+        self.assertEqual(sci.cpool._offsets, cpool._offsets)
+        self.assertEqual(sci.cpool, cpool)
+        self.assertEqual(sci.cpool.consts, cpool.consts)
+
+
+    def test_const_pool_memo(self):
+        ci = load("Sample1")
+        cpool = ci.cpool
+
+        val = cpool.deref_const(3)
+        self.assertEqual(val, ("java/lang/Object", ("<init>", "()V")))
+        self.assertTrue(cpool.deref_const(3) is val)
+
+        val = cpool.pretty_deref_const(3)
+        self.assertEqual(val, "java.lang.Object.<init>():void")
+        self.assertTrue(cpool.pretty_deref_const(3) is val)
+
+
+    def test_attributes_deferred(self):
+        ci = load("Sample1")
+        mi = ci.get_method("getName")
+
+        # the attributes aren't looked up until something asks
+        self.assertEqual(dict.__len__(mi.attribs), 0)
+        self.assertEqual(len(mi.attribs._deferred), 1)
+
+        self.assertTrue(mi.get_attribute("Code") is not None)
+        self.assertEqual(dict.__len__(mi.attribs), 1)
+        self.assertEqual(mi.attribs._deferred, None)
+        self.assertEqual(list(mi.attribs.keys()), ["Code"])
+
+
+    def test_attributes_deferred_methods(self):
+        # the rest of the dict methods also see the deferred attributes
+        ci = load("Sample1")
+        attribs = ci.get_method("getName").attribs
+        dupe = attribs.copy()
+        self.assertEqual(type(dupe), jt.JavaAttributes)
+        self.assertEqual(list(dupe.keys()), ["Code"])
+
+        attribs = load("Sample1").get_method("getName").attribs
+        self.assertEqual(attribs.setdefault("Code", None), dupe["Code"])
+
+        attribs = load("Sample1").get_method("getName").attribs
+        attribs.update(Foo=b"")
+        self.assertEqual(sorted(attribs), ["Code", "Foo"])
+
+        attribs = load("Sample1").get_method("getName").attribs
+        self.assertEqual(attribs.pop("Code"), dupe["Code"])
+        self.assertEqual(len(attribs), 0)
+
+        attribs = load("Sample1").get_method("getName").attribs
+        self.assertEqual(attribs.popitem(), ("Code", dupe["Code"]))
+
+        attribs = load("Sample1").get_method("getName").attribs
+        del attribs["Code"]
+        self.assertEqual(len(attribs), 0)
+
+        attribs = load("Sample1").get_method("getName").attribs
+        attribs.clear()
+        self.assertEqual(len(attribs), 0)
+        self.assertEqual(attribs.get("Code"), None)
+
+
     def test_field_name(self):
         ci = load("Sample1")
         fi = ci.get_field_by_name("name")
@@ -386,6 +473,10 @@ class Sample1Tests(TestCase):
 
         self.assertEqual(lnt, exp)
 
+        offsets, lines = code.get_linenumbertable_columns()
+        self.assertEqual(list(offsets), [0])
+        self.assertEqual(list(lines), [18])
+
         dis = tuple(code.disassemble())
 
         exp = ((0, op.OP_aload_0, ()),
@@ -399,6 +490,27 @@ class Sample1Tests(TestCase):
                          "Sample1.name:java.lang.String")
 
 
+    def test_method_bytecode(self):
+        ci = load("Sample1")
+        mi = ci.get_method("getName")
+
+        self.assertEqual(bytes(mi.get_bytecode()), b"\x2a\xb4\x00\x04\xb0")
+        fi = ci.get_field_by_name("DEFAULT_NAME")
+        self.assertEqual(fi.get_bytecode(), None)
+
+
+    def test_method_code_zero_copy(self):
+        ci = load("Sample1")
+        mi = ci.get_method("getName")
+        code = mi.get_code()
+
+        # the code and attribute bodies are views into the class data
+        self.assertEqual(type(code.code), memoryview)
+        self.assertEqual(type(mi.get_attribute("Code")), memoryview)
+        self.assertEqual(code.code.obj, mi.get_attribute("Code").obj)
+        self.assertEqual(bytes(code.code), b"\x2a\xb4\x00\x04\xb0")
+
+
     def test_method_get_recent_name(self):
         ci = load("Sample1")
         mi = ci.get_method("getRecentName")
@@ -465,6 +577,650 @@ class Sample1Tests(TestCase):
                          "Sample1.recent_name:java.lang.String")
 
 
+class MemberIndexTests(TestCase):
+
+    def test_methods_by_identifier(self):
+        ci = load("Sample1")
+        found = ci.get_methods_by_identifier()
+
+        self.assertTrue(ci.get_methods_by_identifier() is found)
+        self.assertEqual(sorted(found),
+                         sorted(m.get_identifier() for m in ci.methods))
+        self.assertTrue(found["getName()"] is ci.get_method("getName"))
+
+
+    def test_fields_by_identifier(self):
+        ci = load("Sample1")
+        found = ci.get_fields_by_identifier()
+
+        self.assertEqual(sorted(found),
+                         sorted(f.get_identifier() for f in ci.fields))
+        self.assertTrue(found["name"] is ci.get_field_by_name("name"))
+        self.assertEqual(ci.get_field_by_name("missing"), None)
+
+
+    def test_methods_by_name(self):
+        ci = load("Sample1")
+
+        inits = list(ci.get_methods_by_name("<init>"))
+        self.assertEqual(len(inits), 2)
+        self.assertEqual(list(ci.get_methods_by_name("missing")), [])
+
+
+    def test_reset(self):
+        ci = load("Sample1")
+        self.assertNotEqual(ci.get_method("getName"), None)
+
+        ci.methods = tuple(m for m in ci.methods
+                           if m.get_name() != "getName")
+        self.assertEqual(ci.get_method("getName"), None)
+        self.assertFalse("getName()" in ci.get_methods_by_identifier())
+
+
+class DescriptorCacheTest(TestCase):
+
+    def test_cache_info(self):
+        jt.clear_descriptor_caches()
+        mi = load("Sample1").get_method("getName")
+
+        self.assertEqual(mi.pretty_type(), "java.lang.String")
+        before = jt.descriptor_cache_info()["_pretty_type"]
+        self.assertEqual(before.hits, 0)
+        self.assertEqual(before.misses, 1)
+
+        self.assertEqual(mi.pretty_type(), "java.lang.String")
+        after = jt.descriptor_cache_info()["_pretty_type"]
+        self.assertEqual(after.hits, 1)
+        self.assertEqual(after.misses, 1)
+
+        jt.clear_descriptor_caches()
+        cleared = jt.descriptor_cache_info()["_pretty_type"]
+        self.assertEqual(cleared.currsize, 0)
+
+
+def make_cpool(*consts, **kwds):
+    # a constant pool of the given Utf8 strings and Integer values
+    data = [struct.pack(">H", len(consts) + 1)]
+    for const in consts:
+        if isinstance(const, int):
+            data.append(struct.pack(">Bi", jt.CONST_Integer, const))
+        else:
+            data.append(struct.pack(">BH", jt.CONST_Utf8, len(const)))
+            data.append(const.encode("utf8"))
+
+    cpool = jt.JavaConstantPool()
+    with unpack(b"".join(data), **kwds) as up:
+        cpool.unpack(up)
+    return cpool
+
+
+def make_annotations(cpool, type_ref, key_ref, val_ref):
+    # a table of one annotation with one int element
+    data = struct.pack(">HHHHcH", 1, type_ref, 1, key_ref, b"I", val_ref)
+    return jt.JavaAnnotations(cpool, data)
+
+
+class AnnotationsTest(TestCase):
+
+    def test_unpack(self):
+        annos = make_annotations(make_cpool("LFoo;", "value", 42), 1, 2, 3)
+
+        self.assertEqual(len(annos), 1)
+        self.assertEqual(annos.get_const_refs(), (1, 2, 3))
+        self.assertEqual(annos._annotations, None)
+
+        self.assertEqual(annos[0].pretty_type(), "Foo")
+        self.assertEqual(list(annos[0].keys()), ["value"])
+        self.assertEqual(repr(annos), "(@Foo(value=I#3),)")
+
+
+    def test_same_data(self):
+        left = make_annotations(make_cpool("LFoo;", "value", 42), 1, 2, 3)
+        right = make_annotations(make_cpool("LFoo;", "value", 42), 1, 2, 3)
+
+        # equal without unpacking either side
+        self.assertEqual(left, right)
+        self.assertEqual(left._annotations, None)
+        self.assertEqual(right._annotations, None)
+
+        other = make_annotations(make_cpool("LFoo;", "value", 43), 1, 2, 3)
+        self.assertNotEqual(left, other)
+
+
+    def test_different_data(self):
+        left = make_annotations(make_cpool("LFoo;", "value", 42), 1, 2, 3)
+        right = make_annotations(make_cpool("value", 42, "LFoo;"), 3, 1, 2)
+
+        self.assertEqual(left, right)
+        self.assertEqual(left, tuple(right))
+        self.assertNotEqual(left, tuple())
+
+        other = make_annotations(make_cpool("value", 42, "LBar;"), 3, 1, 2)
+        self.assertNotEqual(left, other)
+
+
+    def test_pickle(self):
+        annos = make_annotations(make_cpool("LFoo;", "value", 42), 1, 2, 3)
+        self.assertEqual(pickle.loads(pickle.dumps(annos)), annos)
+
+        # with the pool and data as views, as from a zero-copy unpack
+        cpool = make_cpool("LFoo;", "value", 42, zero_copy=True)
+        annos = jt.JavaAnnotations(cpool, memoryview(annos.data))
+        self.assertEqual(pickle.loads(pickle.dumps(annos)), annos)
+
+
+    def test_parameters(self):
+        cpool = make_cpool("LFoo;", "value", 42)
+        one = make_annotations(cpool, 1, 2, 3)
+
+        data = b"\x03" + one.data + b"\x00\x00" + one.data
+        params = jt._unpack_parameter_annotations(cpool, data)
+
+        self.assertEqual(params, (one, tuple(), one))
+
+
+class SymbolTest(TestCase):
+
+    def test_symbols(self):
+        ci = load("Sample1")
+
+        provides = ci.get_provides_symbols()
+        self.assertTrue(("Sample1",) in provides)
+        self.assertTrue(("Sample1", "getName", "()Ljava/lang/String;")
+                        in provides)
+
+        requires = ci.get_requires_symbols()
+        self.assertTrue(("java/lang/Object",) in requires)
+
+        self.assertEqual(sorted(map(jt.pretty_symbol, provides)),
+                         sorted(ci.get_provides()))
+        self.assertEqual(sorted(map(jt.pretty_symbol, requires)),
+                         sorted(ci.get_requires()))
+
+
+    def test_pretty_symbol(self):
+        pretty = jt.pretty_symbol
+
+        self.assertEqual(pretty(("a/b/C",)), "a.b.C")
+        self.assertEqual(pretty(("a/b/C", "x", "[I")), "a.b.C.x:int[]")
+        self.assertEqual(pretty(("a/b/C", "f", "(ILa/D;)V")),
+                         "a.b.C.f(int,a.D):void")
+
+
+    def test_symbol_table(self):
+        table = jt.SymbolTable()
+
+        first = table.intern(("a/b/C", "f", "()V"))
+        self.assertEqual(table.intern(("a/b/C",)), 1)
+        self.assertEqual(table.intern(("a/b/C", "f", "()V")), first)
+        self.assertEqual(len(table), 2)
+
+        self.assertEqual(table.get_symbol(first), ("a/b/C", "f", "()V"))
+        self.assertEqual(table.pretty(first), "a.b.C.f():void")
+        self.assertEqual(table.render({first: 1, 1: 2}),
+                         {"a.b.C.f():void": 1, "a.b.C": 2})
+
+
+class Sample1HeaderTests(TestCase):
+
+    def test_class_header(self):
+        with open(get_class_fn("Sample1"), "rb") as fd:
+            data = fd.read()
+
+        ci = jt.unpack_class(data)
+        header = jt.unpack_class_header(data)
+
+        self.assertEqual(header.version, ci.version)
+        self.assertEqual(header.access_flags, ci.access_flags)
+        self.assertEqual(header.get_platform(), ci.get_platform())
+        self.assertEqual(header.get_this(), ci.get_this())
+        self.assertEqual(header.get_super(), ci.get_super())
+        self.assertEqual(header.pretty_this(), ci.pretty_this())
+        self.assertEqual(header.pretty_super(), ci.pretty_super())
+        self.assertEqual(header.get_interfaces(), ci.get_interfaces())
+
+
+class ProfileTests(TestCase):
+
+    def load(self, which, profile):
+        with open(get_class_fn(which), "rb") as fd:
+            return jt.unpack_class(fd.read(), profile=profile)
+
+
+    def test_no_debug(self):
+        ci = self.load("Sample1", jt.PROFILE_NO_DEBUG)
+        code = ci.get_method("getName").get_code()
+
+        self.assertNotEqual(code, None)
+        self.assertEqual(code.get_linenumbertable(), tuple())
+        self.assertEqual(ci.get_sourcefile(), "Sample1.java")
+
+
+    def test_no_code(self):
+        ci = self.load("Sample1", jt.PROFILE_NO_CODE)
+        self.assertEqual(ci.get_method("getName").get_code(), None)
+
+        full = load("Sample1")
+        self.assertEqual(set(ci.get_requires()), set(full.get_requires()))
+        self.assertEqual(set(ci.get_provides(private=True)),
+                         set(full.get_provides(private=True)))
+
+
+    def test_api_only(self):
+        ci = self.load("Sample1", jt.PROFILE_API_ONLY)
+        full = load("Sample1")
+
+        self.assertEqual(ci.get_field_by_name("name"), None)
+        self.assertEqual(set(ci.get_provides()), set(full.get_provides()))
+
+
+    def test_unknown(self):
+        self.assertRaises(ValueError, lambda: self.load("Sample1", "nope"))
+
+
+class SerializeTests(TestCase):
+
+    def test_serialize(self):
+        with open(get_class_fn("Sample3"), "rb") as fd:
+            data = fd.read()
+
+        ci = jt.unpack_class(data, profile=jt.PROFILE_NO_DEBUG)
+        ser = ci.serialize()
+
+        # the class data, less the magic bytes, plus a small header
+        self.assertTrue(data[4:] in ser)
+
+        sci = jt.deserialize_class(ser)
+        self.assertEqual(sci.profile, jt.PROFILE_NO_DEBUG)
+        self.assertEqual(sci.get_this(), ci.get_this())
+        self.assertEqual(sci.cpool, ci.cpool)
+
+        # the members are unpacked only once asked for
+        self.assertEqual(sci._fields, None)
+        self.assertEqual(sci._methods, None)
+
+        self.assertEqual(set(sci.get_provides(private=True)),
+                         set(ci.get_provides(private=True)))
+        self.assertEqual(set(sci.get_requires()), set(ci.get_requires()))
+
+        code = sci.get_method("getData").get_code()
+        self.assertEqual(bytes(code.code),
+                         bytes(ci.get_method("getData").get_code().code))
+
+        self.assertEqual(sci.serialize(), ser)
+
+
+    def test_pickle(self):
+        with open(get_class_fn("Sample3"), "rb") as fd:
+            data = fd.read()
+
+        ci = jt.unpack_class(data)
+        pci = pickle.loads(pickle.dumps(ci, 2))
+        self.assertEqual(set(pci.get_provides()), set(ci.get_provides()))
+
+        # from a stream, the class data isn't kept, so pickling falls
+        # back to the default
+        ci = jt.unpack_class(BytesIO(data))
+        self.assertRaises(ValueError, ci.serialize)
+
+        pci = pickle.loads(pickle.dumps(ci, 2))
+        self.assertEqual(set(pci.get_provides()), set(ci.get_provides()))
+
+
+    def test_pickle_parts(self):
+        # the parts of a class unpacked zero-copy hold views of its
+        # data, and still pickle on their own
+        with open(get_class_fn("Sample3"), "rb") as fd:
+            ci = jt.unpack_class(fd.read())
+
+        cpool = pickle.loads(pickle.dumps(ci.cpool, 2))
+        self.assertEqual(cpool, ci.cpool)
+
+        method = ci.get_method("getData")
+        pmethod = pickle.loads(pickle.dumps(method, 2))
+        self.assertEqual(pmethod.pretty_descriptor(),
+                         method.pretty_descriptor())
+        self.assertEqual(pmethod.attribs, method.attribs)
+
+        code = method.get_code()
+        pcode = pickle.loads(pickle.dumps(code, 2))
+        self.assertEqual(pcode.code, bytes(code.code))
+        self.assertEqual(pcode.max_stack, code.max_stack)
+        self.assertEqual(list(pcode.disassemble()),
+                         list(code.disassemble()))
+
+
+    def test_pickle_interns(self):
+        # the interns dict is shared between pools, and is left out
+        # of a pickled pool
+        interns = {}
+        with open(get_class_fn("Sample3"), "rb") as fd:
+            ci = jt.unpack_class(fd.read(), interns=interns)
+        ci.get_provides()
+        self.assertTrue(interns)
+
+        cpool = pickle.loads(pickle.dumps(ci.cpool, 2))
+        self.assertEqual(cpool, ci.cpool)
+        self.assertNotIn(b"_interns", pickle.dumps(ci.cpool, 2))
+
+
+    def test_bad_data(self):
+        bad = lambda: jt.deserialize_class(b"JTCI\x02\x00" + b"\x00" * 12)
+        self.assertRaises(jt.ClassUnpackException, bad)
+
+        bad = lambda: jt.deserialize_class(b"\xca\xfe\xba\xbe")
+        self.assertRaises(jt.ClassUnpackException, bad)
+
+
+class ModifiedUTF8Test(TestCase):
+
+    def test_ascii(self):
+        self.assertEqual(jt.decode_modified_utf8(b"Sample1"), "Sample1")
+        self.assertEqual(jt.decode_modified_utf8(memoryview(b"abc")), "abc")
+        self.assertEqual(jt.decode_modified_utf8(b""), "")
+
+
+    def test_nul(self):
+        val = jt.decode_modified_utf8(b"a\xc0\x80b")
+        self.assertEqual(val, "a\x00b")
+
+
+    def test_bmp(self):
+        val = jt.decode_modified_utf8(b"caf\xc3\xa9 \xe2\x82\xac")
+        self.assertEqual(val, u"caf\u00e9 \u20ac")
+
+
+    def test_hangul(self):
+        # U+D55C is led by the byte ED, but isn't a surrogate
+        data = memoryview(b"\xed\x95\x9c\xea\xb8\x80")
+        self.assertEqual(jt.decode_modified_utf8(data), u"\ud55c\uae00")
+
+
+    def test_supplementary(self):
+        # U+1F600 as a CESU-8 surrogate pair
+        val = jt.decode_modified_utf8(b"x\xed\xa0\xbd\xed\xb8\x80\xc0\x80")
+        self.assertEqual(val, u"x\U0001F600\x00")
+
+
+    def test_unpaired_surrogate(self):
+        val = jt.decode_modified_utf8(b"\xed\xa0\xbdx")
+        self.assertEqual(val, u"\ud83dx")
+
+
+    def test_intern(self):
+        data = b"interned_" + str(id(self)).encode("ascii")
+        a = jt.decode_modified_utf8(data, intern=True)
+        b = jt.decode_modified_utf8(bytearray(data), intern=True)
+        self.assertTrue(a is b)
+
+
+class DisassemblyTest(TestCase):
+
+    def test_arrays(self):
+        ci = load("Sample1")
+        code = ci.get_method("getName").get_code()
+        dis = code.get_disassembly()
+
+        self.assertEqual(type(dis), op.Disassembly)
+        self.assertEqual(list(dis.offsets), [0, 1, 4])
+        self.assertEqual(dis.opcodes, b"\x2a\xb4\xb0")
+        self.assertEqual(dis.args, {1: (4,)})
+
+        self.assertTrue(code.disassemble() is dis)
+        self.assertEqual(len(dis), 3)
+        self.assertEqual(dis[1], (1, op.OP_getfield, (4,)))
+        self.assertEqual(dis, ((0, op.OP_aload_0, ()),
+                               (1, op.OP_getfield, (4,)),
+                               (4, op.OP_areturn, ())))
+
+        # hashable like the tuple it used to be
+        self.assertEqual(hash(dis), hash(tuple(dis)))
+        self.assertTrue(tuple(dis) in set([dis]))
+
+
+    def test_variable_args(self):
+        bytecode = b"".join((
+            b"\x00",                           # 0 nop
+            b"\xc4\x15\x01\x00",               # 1 wide iload 256
+            b"\xaa\x00\x00",                   # 5 tableswitch, padding
+            b"\x00\x00\x00\x0a",               # default 10
+            b"\x00\x00\x00\x00\x00\x00\x00\x01",  # low 0, high 1
+            b"\x00\x00\x00\x14\x00\x00\x00\x1e",  # 20, 30
+            b"\xab\x00\x00\x00",               # 28 lookupswitch, padding
+            b"\x00\x00\x00\x05\x00\x00\x00\x01",  # default 5, 1 pair
+            b"\x00\x00\x00\x07\x00\x00\x00\x09",  # 7 => 9
+            b"\xb1",                           # 48 return
+        ))
+
+        exp = ((0, op.OP_nop, ()),
+               (1, op.OP_wide, (op.OP_iload, 256)),
+               (5, op.OP_tableswitch, (10, 0, 1, [20, 30])),
+               (28, op.OP_lookupswitch, (5, [(7, 9)])),
+               (48, op.OP_return, ()))
+
+        dis = op.disassemble_arrays(bytecode)
+        self.assertEqual(tuple(dis), exp)
+        self.assertEqual(sorted(dis.args), [1, 5, 28])
+        self.assertEqual(tuple(op.disassemble(bytecode)), exp)
+
+
+def _linear_line_for_offset(lnt, code_offset):
+    # the original linear search of the line number table, which the
+    # bisect lookup must agree with
+
+    prev_line = 0
+    for (offset, line) in lnt:
+        if offset < code_offset:
+            prev_line = line
+        elif offset == code_offset:
+            return line
+        else:
+            return prev_line
+    return prev_line
+
+
+class CodeLinesTest(TestCase):
+
+    def iter_code(self):
+        for name in ("Sample1", "Sample2", "Sample3", "SampleLambdas"):
+            for method in load(name).methods:
+                code = method.get_code()
+                if code is not None:
+                    yield code
+
+
+    def test_line_for_offset(self):
+        for code in self.iter_code():
+            lnt = code.get_linenumbertable()
+            for offset in range(len(code.code) + 2):
+                self.assertEqual(code.get_line_for_offset(offset),
+                                 _linear_line_for_offset(lnt, offset))
+
+
+    def test_iter_code_by_lines(self):
+        for code in self.iter_code():
+            lnt = code.get_linenumbertable()
+            dis = code.disassemble()
+
+            lines = list()
+            for abs_line, rel_line, codelets in code.iter_code_by_lines():
+                self.assertEqual(rel_line, abs_line - lnt[0][1])
+                for codelet in codelets:
+                    found = _linear_line_for_offset(lnt, codelet[0])
+                    self.assertEqual(abs_line, found)
+                lines.extend(codelets)
+
+            self.assertEqual(tuple(lines), tuple(dis))
+
+
+    def test_instruction_index(self):
+        code = load("Sample1").get_method("getName").get_code()
+
+        # aload_0 at 0, getfield at 1 to 3, areturn at 4
+        found = [code.get_instruction_index(o) for o in range(5)]
+        self.assertEqual(found, [0, 1, 1, 1, 2])
+
+
+    def test_unsorted(self):
+        # an unsorted table is scanned in order, as it always was
+        code = load("Sample1").get_method("getName").get_code()
+        code._lnt = (array("H", [4, 0, 1, 1]), array("H", [30, 10, 20, 21]))
+        lnt = code.get_linenumbertable()
+
+        self.assertEqual(code.get_line_index(), None)
+
+        found = [code.get_line_for_offset(o) for o in range(6)]
+        expected = [_linear_line_for_offset(lnt, o) for o in range(6)]
+        self.assertEqual(found, expected)
+
+        for abs_line, _rel, codelets in code.iter_code_by_lines():
+            for codelet in codelets:
+                found = _linear_line_for_offset(lnt, codelet[0])
+                self.assertEqual(abs_line, found)
+
+
+    def test_sorted(self):
+        code = load("Sample1").get_method("getName").get_code()
+        code._lnt = (array("H", [0, 1, 1, 4]), array("H", [10, 20, 21, 30]))
+        lnt = code.get_linenumbertable()
+
+        offsets, lines = code.get_line_index()
+        self.assertEqual(list(offsets), [0, 1, 1, 4])
+        self.assertEqual(list(lines), [10, 20, 21, 30])
+
+        found = [code.get_line_for_offset(o) for o in range(6)]
+        expected = [_linear_line_for_offset(lnt, o) for o in range(6)]
+        self.assertEqual(found, expected)
+
+        found = [(a, r, len(c)) for a, r, c in code.iter_code_by_lines()]
+        self.assertEqual(found, [(10, 0, 1), (20, 10, 1), (30, 20, 1)])
+
+
+class FingerprintTest(TestCase):
+
+    def test_raw(self):
+        code = load("Sample1").get_method("getName").get_code()
+
+        found = code.fingerprint()
+        self.assertEqual(found, sha256(b"\x2a\xb4\x00\x04\xb0").hexdigest())
+        self.assertTrue(code.fingerprint() is found)
+
+
+    def test_deref(self):
+        code = load("Sample1").get_method("getName").get_code()
+        other = load("Sample1").get_method("getName").get_code()
+
+        self.assertNotEqual(code.fingerprint(True), code.fingerprint())
+        self.assertEqual(code.fingerprint(True), other.fingerprint(True))
+
+        # same instructions and the same constant index, but the
+        # index now refers to another constant
+        other.cpool = load("Sample2").cpool
+        other._fingerprints = [None, None]
+        self.assertEqual(code.fingerprint(), other.fingerprint())
+        self.assertNotEqual(code.fingerprint(True), other.fingerprint(True))
+
+
+    def test_const_offsets(self):
+        code = load("Sample1").get_method("<init>").get_code()
+        dis = code.get_disassembly()
+
+        found = [o for o, c, _a in dis if op.has_const_arg(c)]
+        self.assertEqual(dis.get_const_offsets(), found)
+        self.assertEqual(found, [1, 3])
+
+
+    def test_different(self):
+        ci = load("Sample1")
+        left = ci.get_method("getName").get_code()
+        right = ci.get_method("getRecentName").get_code()
+
+        self.assertNotEqual(left.fingerprint(), right.fingerprint())
+        self.assertNotEqual(left.fingerprint(True), right.fingerprint(True))
+
+
+class ControlFlowTest(TestCase):
+
+    # return x ? 1 : 0
+    bytecode = b"".join((
+        b"\x1a",               # 0 iload_0
+        b"\x99\x00\x07",       # 1 ifeq 8
+        b"\x04",               # 4 iconst_1
+        b"\xa7\x00\x04",       # 5 goto 9
+        b"\x03",               # 8 iconst_0
+        b"\xac",               # 9 ireturn
+    ))
+
+
+    def test_blocks(self):
+        dis = op.disassemble_arrays(self.bytecode)
+        cfg = op.build_cfg(dis, [(0, 4, 8)])
+
+        self.assertEqual(len(cfg), 4)
+        self.assertEqual(list(cfg.starts), [0, 4, 8, 9])
+        self.assertEqual(list(cfg.indexes), [0, 2, 4, 5, 6])
+        self.assertEqual(cfg.get_block(1), ((4, op.OP_iconst_1, ()),
+                                            (5, op.OP_goto, (4,))))
+        self.assertEqual(cfg.get_block_for_offset(6), 1)
+
+        self.assertEqual(cfg.get_successors(0),
+                         [(1, op.EDGE_FALLTHROUGH), (2, op.EDGE_BRANCH),
+                          (2, op.EDGE_EXCEPTION)])
+        self.assertEqual(cfg.get_successors(1), [(3, op.EDGE_BRANCH)])
+        self.assertEqual(cfg.get_successors(2), [(3, op.EDGE_FALLTHROUGH)])
+        self.assertEqual(cfg.get_successors(3), [])
+        self.assertEqual(cfg.get_predecessors(3),
+                         [(1, op.EDGE_BRANCH), (2, op.EDGE_FALLTHROUGH)])
+
+
+    def test_wide_ret(self):
+        bytecode = b"".join((
+            b"\xc4\x15\x01\x00",   # 0 wide iload 256
+            b"\xc4\xa9\x01\x00",   # 4 wide ret 256
+            b"\x00",               # 8 nop
+            b"\xb1",               # 9 return
+        ))
+
+        cfg = op.build_cfg(op.disassemble_arrays(bytecode))
+
+        # only the widened ret ends a block, and it doesn't fall through
+        self.assertEqual(list(cfg.starts), [0, 8])
+        self.assertEqual(cfg.get_successors(0), [])
+        self.assertEqual(cfg.get_predecessors(1), [])
+
+
+    def test_block_hashes(self):
+        # the same, with a nop inserted after the goto
+        moved = b"".join((
+            b"\x1a",               # 0 iload_0
+            b"\x99\x00\x08",       # 1 ifeq 9
+            b"\x04",               # 4 iconst_1
+            b"\xa7\x00\x05",       # 5 goto 10
+            b"\x00",               # 8 nop
+            b"\x03",               # 9 iconst_0
+            b"\xac",               # 10 ireturn
+        ))
+
+        hashes = op.build_cfg(op.disassemble_arrays(self.bytecode))
+        hashes = hashes.get_block_hashes()
+        moved = op.build_cfg(op.disassemble_arrays(moved))
+        moved = moved.get_block_hashes()
+
+        self.assertEqual(len(set(hashes)), 4)
+        self.assertEqual(list(hashes), [moved[0], moved[1],
+                                        moved[3], moved[4]])
+
+
+    def test_code(self):
+        code = load("Sample1").get_method("getName").get_code()
+        cfg = code.get_cfg()
+
+        self.assertTrue(code.get_cfg() is cfg)
+        self.assertEqual(len(cfg), 1)
+        self.assertEqual(cfg.get_block(0), tuple(code.disassemble()))
+        self.assertEqual(len(cfg.edge_from), 0)
+
+
 class Sample2Test(TestCase):
 
     def test_interface(self):
@@ -1155,5 +1911,14 @@ class Sample3Test(TestCase):
         self.assertEqual(excs, tuple())
 
 
+class SampleLambdasTest(TestCase):
+
+    def test_method_handle_requires(self):
+        ci = load("SampleLambdas")
+        reqs = ci.get_requires()
+
+        self.assertTrue("java.lang.invoke.LambdaMetafactory" in reqs)
+
+
 #
 # The end.
@@ -0,0 +1,120 @@
+# This library is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as
+# published by the Free Software Foundation; either version 3 of the
+# License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, see
+# <http://www.gnu.org/licenses/>.
+
+
+"""
+unit tests for javatools.cache
+
+author: Christopher O'Brien  <obriencj@gmail.com>
+license: LGPL v.3
+"""
+
+
+from os import listdir, utime
+from os.path import join
+from shutil import rmtree
+from tempfile import mkdtemp
+from unittest import TestCase
+
+from . import get_data_fn, load
+from javatools.cache import ClassCache, class_summary
+from javatools.jarinfo import JarInfo
+
+
+class ClassCacheTest(TestCase):
+
+    jar = get_data_fn(join("test_jarinfo", "Sample.jar"))
+
+
+    def setUp(self):
+        self.path = mkdtemp()
+
+
+    def tearDown(self):
+        rmtree(self.path)
+
+
+    def test_round_trip(self):
+        cache = ClassCache(self.path)
+        summary = class_summary(load("Sample1"))
+
+        self.assertEqual(cache.get("Sample1"), None)
+        cache.put("Sample1", summary)
+        self.assertEqual(cache.get("Sample1"), summary)
+
+        # a fresh instance sees the same entries
+        cache = ClassCache(self.path)
+        self.assertEqual(cache.get("Sample1"), summary)
+
+
+    def test_stale_version(self):
+        cache = ClassCache(self.path)
+        cache.put("Sample1", {"version": -1})
+        self.assertEqual(cache.get("Sample1"), None)
+
+
+    def test_evict(self):
+        summary = class_summary(load("Sample1"))
+
+        cache = ClassCache(self.path)
+        cache.put("first", summary)
+        size = cache._size
+
+        # room for two entries, so the least recently used goes
+        cache.max_size = size * 2
+        cache.put("second", summary)
+
+        # age both entries so that the read of first stands out
+        # regardless of the resolution of the file times
+        utime(join(self.path, "first.json"), (1, 1))
+        utime(join(self.path, "second.json"), (2, 2))
+        cache.get("first")
+        cache.put("third", summary)
+
+        self.assertEqual(sorted(listdir(self.path)),
+                         ["first.json", "third.json"])
+
+
+    def test_rewrite(self):
+        summary = class_summary(load("Sample1"))
+
+        cache = ClassCache(self.path)
+        cache.put("first", summary)
+        size = cache._size
+
+        # rewriting an entry doesn't count it twice
+        cache.put("first", summary)
+        cache.put("first", summary)
+        self.assertEqual(cache._size, size)
+
+        cache.put("second", summary)
+        self.assertEqual(cache._size, size * 2)
+
+
+    def test_jarinfo(self):
+        with JarInfo(self.jar) as ji:
+            requires = ji.get_requires()
+            provides = ji.get_provides()
+
+        for _attempt in range(2):
+            cache = ClassCache(self.path)
+            with JarInfo(self.jar, cache=cache) as ji:
+                self.assertEqual(ji.get_requires(), requires)
+                self.assertEqual(ji.get_provides(), provides)
+
+        self.assertEqual(len(listdir(self.path)), 2)
+
+
+#
+# The end.
@@ -0,0 +1,81 @@
+# This library is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as
+# published by the Free Software Foundation; either version 3 of the
+# License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, see
+# <http://www.gnu.org/licenses/>.
+
+
+"""
+unit tests for javatools.dirutils
+
+license: LGPL v.3
+"""
+
+
+from fnmatch import fnmatch
+from unittest import TestCase
+
+from javatools.dirutils import PatternSet, fnmatches
+
+
+class PatternSetTest(TestCase):
+
+    patterns = ("java.*", "*.class", "META-INF/MANIFEST.MF",
+                "Sample?.*", "org.[a-f]*", "*", "")
+
+    entries = ("java.lang.String", "javax.swing.JFrame", "Sample1.class",
+               "META-INF/MANIFEST.MF", "META-INF/manifest.mf",
+               "Sample1.getName():java.lang.String", "org.example.Foo",
+               "org.xml.Bar", "", ".class")
+
+
+    def test_fnmatch(self):
+        # each pattern alone, and all but the catch-all together, agree
+        # with fnmatch
+        for pattern in self.patterns:
+            ps = PatternSet([pattern])
+            for entry in self.entries:
+                expected = bool(pattern) and fnmatch(entry, pattern)
+                self.assertEqual(ps.matches(entry), expected,
+                                 (pattern, entry))
+
+        patterns = self.patterns[:-2]
+        ps = PatternSet(patterns)
+        for entry in self.entries:
+            expected = any(fnmatch(entry, p) for p in patterns)
+            self.assertEqual(ps.matches(entry), expected, entry)
+
+
+    def test_merge(self):
+        ps = PatternSet(["java.*", None, ""])
+        self.assertEqual(len(ps), 1)
+        self.assertEqual(len(PatternSet()), 0)
+
+        merged = PatternSet([ps, "*.class"])
+        self.assertEqual(merged.patterns, ("java.*", "*.class"))
+
+        self.assertTrue(fnmatches("java.lang.String", ps))
+        self.assertTrue(fnmatches("Sample1.class", ps, "*.class"))
+        self.assertFalse(fnmatches("Sample1.java", ps, "*.class"))
+
+
+    def test_filter_out(self):
+        ps = PatternSet(["java.*", "Sample?.*"])
+        self.assertEqual(ps.filter_out(self.entries),
+                         ["javax.swing.JFrame", "META-INF/MANIFEST.MF",
+                          "META-INF/manifest.mf", "org.example.Foo",
+                          "org.xml.Bar", "", ".class"])
+        self.assertEqual(PatternSet().filter_out(self.entries),
+                         list(self.entries))
+
+
+#
+# The end.
@@ -23,7 +23,8 @@ license: LGPL v.3
 import os
 from unittest import TestCase
 from . import get_data_fn
-from javatools.jarinfo import main
+from javatools import SymbolTable
+from javatools.jarinfo import main, JarInfo
 
 
 class JarinfoTest(TestCase):
@@ -37,3 +38,39 @@ class JarinfoTest(TestCase):
     # Test that a classinfo-specific option is accepted.
     def test_jarinfo_options(self):
         self.assertEqual(0, main(["argv0", "--jar-classes", self.jar]))
+
+    def test_iter_class_headers(self):
+        with JarInfo(self.jar) as ji:
+            headers = dict(ji.iter_class_headers())
+
+        self.assertEqual(sorted(headers), ["Sample1.class", "Sample2.class"])
+
+        header = headers["Sample1.class"]
+        self.assertEqual(header.get_this(), "Sample1")
+        self.assertEqual(header.get_super(), "java/lang/Object")
+        self.assertEqual(header.get_interfaces(), tuple())
+
+    def test_interns(self):
+        with JarInfo(self.jar) as ji:
+            ci1 = ji.get_classinfo("Sample1.class")
+            ci2 = ji.get_classinfo("Sample2.class")
+
+        name1 = ci1.methods[0].get_name()
+        name2 = ci2.methods[0].get_name()
+
+        self.assertEqual(name1, "<init>")
+        self.assertTrue(name1 is name2)
+        self.assertTrue(ji.interns["<init>"] is name1)
+
+    def test_symbols(self):
+        symbols = SymbolTable()
+        with JarInfo(self.jar, symbols=symbols) as ji:
+            requires = ji.get_requires_ids()
+            provides = ji.get_provides_ids()
+
+            self.assertEqual(symbols.render(requires), ji.get_requires())
+            self.assertEqual(symbols.render(provides), ji.get_provides())
+
+        sample1 = symbols.intern(("Sample1",))
+        self.assertTrue(sample1 in provides)
+        self.assertFalse(sample1 in requires)
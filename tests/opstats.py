@@ -0,0 +1,121 @@
+# This library is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as
+# published by the Free Software Foundation; either version 3 of the
+# License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, see
+# <http://www.gnu.org/licenses/>.
+
+
+"""
+unit tests for javatools.opstats
+
+license: LGPL v.3
+"""
+
+
+from collections import Counter
+from os.path import join
+from shutil import copy, rmtree
+from tempfile import mkdtemp
+from unittest import TestCase
+
+from . import get_class_fn, get_data_fn, load
+from javatools import opstats
+from javatools.distinfo import DistInfo
+from javatools.jarinfo import JarInfo, main
+from javatools.opcodes import get_opname_by_code
+
+
+def expected_stats(info):
+    # the same statistics, via the disassembled tuples
+
+    found = Counter()
+    for method in info.methods:
+        code = method.get_code()
+        if code is not None:
+            found.update(get_opname_by_code(c) for _o, c, _a
+                         in code.disassemble())
+
+    return {"instructions": sum(found.values()), "opcodes": dict(found)}
+
+
+class OpcodeStatsTest(TestCase):
+
+    jar = get_data_fn(join("test_jarinfo", "Sample.jar"))
+
+
+    def test_class(self):
+        ci = load("Sample1")
+        stats = opstats.class_opcode_stats(ci)
+
+        self.assertEqual(stats, expected_stats(ci))
+        self.assertEqual(stats["instructions"], 25)
+        self.assertEqual(stats["opcodes"]["aload_0"], 6)
+
+
+    def test_counter(self):
+        # the fallback for when NumPy isn't available
+        numpy = opstats.numpy
+        opstats.numpy = None
+        try:
+            counts = opstats.opcode_counts(b"\x2a\x2a\xb0")
+        finally:
+            opstats.numpy = numpy
+
+        self.assertEqual(len(counts), 256)
+        self.assertEqual(counts[0x2a], 2)
+        self.assertEqual(counts[0xb0], 1)
+        self.assertEqual(sum(counts), 3)
+
+
+    def test_jar(self):
+        with JarInfo(self.jar) as ji:
+            stats = opstats.jar_opcode_stats(ji)
+            expected = dict((entry, expected_stats(ji.get_classinfo(entry)))
+                            for entry in ji.get_classes())
+
+        self.assertEqual(stats["classes"], expected)
+
+        total = Counter()
+        for found in expected.values():
+            total.update(found["opcodes"])
+        self.assertEqual(stats["opcodes"], dict(total))
+        self.assertEqual(stats["instructions"], sum(total.values()))
+
+
+    def test_dist(self):
+        tmpdir = mkdtemp()
+        try:
+            copy(self.jar, tmpdir)
+            copy(get_class_fn("Sample3"), tmpdir)
+
+            dist = DistInfo(tmpdir)
+            stats = opstats.dist_opcode_stats(dist)
+            dist.close()
+        finally:
+            rmtree(tmpdir)
+
+        with JarInfo(self.jar) as ji:
+            jar_stats = opstats.jar_opcode_stats(ji)
+
+        self.assertEqual(stats["jars"], {"Sample.jar": jar_stats})
+        self.assertEqual(stats["classes"],
+                         {"Sample3.class": expected_stats(load("Sample3"))})
+        self.assertEqual(stats["instructions"],
+                         jar_stats["instructions"] +
+                         stats["classes"]["Sample3.class"]["instructions"])
+
+
+    def test_cli(self):
+        self.assertEqual(0, main(["argv0", "--opcode-stats", self.jar]))
+
+
+#
+# The end.
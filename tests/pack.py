@@ -22,14 +22,13 @@ license: LGPL v.3
 
 
 from abc import ABCMeta, abstractmethod
+from io import BytesIO
 from unittest import TestCase
-from six import add_metaclass, BytesIO
 
 from javatools.pack import *
 
 
-@add_metaclass(ABCMeta)
-class UnpackerTests(object):
+class UnpackerTests(object, metaclass=ABCMeta):
     """
     Common tests for both unpacker types
     """
@@ -82,6 +81,15 @@ class UnpackerTests(object):
         self.assertRaises(UnpackException, lambda: up.unpack_struct(_H))
 
 
+    def test_skip(self):
+        data = b"\x05\x04\x03\x02\x01"
+
+        with self.unpack(data) as up:
+            up.skip(3)
+            self.assertEqual(up.read(1), b"\x02")
+            self.assertRaises(UnpackException, lambda: up.skip(2))
+
+
     def test_array(self):
         data = "\x00\x02AB"
 
@@ -105,6 +113,29 @@ class UnpackerTests(object):
             self.assertEqual(b, (66,))
 
 
+    def test_table(self):
+        data = b"\x00\x02\x00\x01\x00\x02\x00\x03\x00\x04"
+
+        _HH = compile_struct(">HH")
+        with self.unpack(data) as up:
+            self.assertEqual(up.unpack_struct_table(_HH), ((1, 2), (3, 4)))
+
+        with self.unpack(data) as up:
+            a, b = up.unpack_struct_columns(_HH)
+            self.assertEqual(list(a), [1, 3])
+            self.assertEqual(list(b), [2, 4])
+
+        _BH = compile_struct(">BH")
+        with self.unpack(b"\x00\x02\x01\x00\x02\x03\x00\x04") as up:
+            a, b = up.unpack_struct_columns(_BH)
+            self.assertEqual(list(a), [1, 3])
+            self.assertEqual(list(b), [2, 4])
+
+        with self.unpack(b"\x00\x00") as up:
+            a, b = up.unpack_struct_columns(_HH)
+            self.assertEqual((len(a), len(b)), (0, 0))
+
+
 class BufferTest(UnpackerTests, TestCase):
 
     def unpacker_type(self):
@@ -121,6 +152,25 @@ class BufferTest(UnpackerTests, TestCase):
                             "but {} received".format(type(data).__name__))
 
 
+class ZeroCopyBufferTest(BufferTest):
+
+    def unpack(self, data):
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        return unpack(data, zero_copy=True)
+
+
+    def test_read_view(self):
+        data = b"\x05\x04\x03\x02\x01"
+
+        with self.unpack(data) as up:
+            up.read(1)
+            col = up.read(3)
+            self.assertEqual(type(col), memoryview)
+            self.assertEqual(col, b"\x04\x03\x02")
+            self.assertEqual(col.obj, data)
+
+
 class StreamTest(UnpackerTests, TestCase):
 
     def unpacker_type(self):
@@ -136,5 +186,54 @@ class StreamTest(UnpackerTests, TestCase):
             raise TypeError("This test expects instance of 'bytes' or 'str', "
                             "but {} received".format(type(data).__name__))
 
+
+class ReadOnlyIO(object):
+    """
+    a stream without readinto, and which returns less than asked of
+    it from each read
+    """
+
+    def __init__(self, data):
+        self.data = BytesIO(data)
+
+
+    def read(self, count):
+        return self.data.read(min(count, 3))
+
+
+class SmallBufferStreamTest(StreamTest):
+
+    def unpack(self, data):
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        return StreamUnpacker(BytesIO(data), 2)
+
+
+    def test_large_read(self):
+        data = b"\x05\x04\x03\x02\x01\x00"
+
+        with self.unpack(data) as up:
+            self.assertEqual(up.read(1), b"\x05")
+            self.assertEqual(up.read(4), b"\x04\x03\x02\x01")
+            self.assertRaises(UnpackException, lambda: up.read(4))
+
+
+class ReadOnlyStreamTest(StreamTest):
+
+    def unpack(self, data):
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        return StreamUnpacker(ReadOnlyIO(data), 4)
+
+
+    def test_large_read(self):
+        # larger than the buffer, and more than one read of the stream
+        data = b"\x09\x08\x07\x06\x05\x04\x03\x02\x01\x00"
+
+        with self.unpack(data) as up:
+            self.assertEqual(up.read(1), b"\x09")
+            self.assertEqual(up.read(8), data[1:9])
+            self.assertRaises(UnpackException, lambda: up.read(4))
+
 #
 # The end.